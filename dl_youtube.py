@@ -2,11 +2,26 @@
 from __future__ import annotations
 
 import argparse
+from concurrent.futures import ThreadPoolExecutor
+import functools
 from pathlib import Path
-import urllib.request
-import urllib.error
+import shutil
 
-from yt_dlp import YoutubeDL
+import urllib3
+
+
+# サムネ取得用のコネクションプール（サイズ候補を順に試す間 TLS 接続を使い回す）
+_THUMB_POOL = urllib3.HTTPSConnectionPool("img.youtube.com", maxsize=4, block=False)
+THUMB_COPY_BUFSIZE = 64 * 1024
+
+# 分割配信（DASH/HLS）の形式のとき、フラグメントを同時に取得する数
+YTDLP_CONCURRENT_FRAGMENTS = 4
+
+
+@functools.lru_cache(maxsize=64)
+def _ensure_dir(path: Path) -> None:
+    """出力先ディレクトリを作成する（同じディレクトリに対しては 1 回だけ）。"""
+    path.mkdir(parents=True, exist_ok=True)
 
 
 # ========= VIDEO =========
@@ -14,11 +29,11 @@ def download_video(video_id: str, output_path: Path) -> Path | None:
     """
     動画（映像+音声）をダウンロードして MP4 で保存する。
     ユーザーが指定した拡張子は無視して、常に .mp4 で保存。
+    output_path は main() で expanduser().resolve() 済みのものを渡す。
     """
     url = f"https://www.youtube.com/watch?v={video_id}"
 
-    output_path = output_path.expanduser().resolve()
-    output_path.parent.mkdir(parents=True, exist_ok=True)
+    _ensure_dir(output_path.parent)
 
     base = output_path.with_suffix("")  # 拡張子なしベース名
     ext = "mp4"
@@ -29,10 +44,46 @@ def download_video(video_id: str, output_path: Path) -> Path | None:
         "outtmpl": str(base) + ".%(ext)s",
         "merge_output_format": ext,
         "extractor_args": {"youtube": {"player_client": ["android"]}},
+        "concurrent_fragment_downloads": YTDLP_CONCURRENT_FRAGMENTS,
     }
 
     final_path = base.with_suffix(f".{ext}")
 
+    # yt_dlp の import は重い（extractor の読み込み）ので、実際にダウンロードするときだけ行う
+    from yt_dlp import YoutubeDL
+
+    with YoutubeDL(ydl_opts) as ydl:
+        ydl.download([url])
+
+    return final_path if final_path.exists() else None
+
+
+# ========= AUDIO =========
+def download_audio(video_id: str, output_path: Path) -> Path | None:
+    """
+    音声だけをダウンロードして m4a で保存する（文字起こし用）。
+    動画より小さいので先に揃い、動画のダウンロードを待たずに後続処理を始められる。
+    ユーザーが指定した拡張子は無視して、常に .m4a で保存。
+    output_path は main() で expanduser().resolve() 済みのものを渡す。
+    """
+    url = f"https://www.youtube.com/watch?v={video_id}"
+
+    _ensure_dir(output_path.parent)
+
+    final_path = output_path.with_suffix(".m4a")
+
+    # 音声のみの m4a が無い場合は mp4（映像+音声）で代用する（どちらも MP4 コンテナ）
+    ydl_opts: dict = {
+        "format": "ba[ext=m4a]/b[ext=mp4]",
+        "noplaylist": True,
+        "outtmpl": str(final_path),
+        "extractor_args": {"youtube": {"player_client": ["android"]}},
+        "concurrent_fragment_downloads": YTDLP_CONCURRENT_FRAGMENTS,
+    }
+
+    # yt_dlp の import は重い（extractor の読み込み）ので、実際にダウンロードするときだけ行う
+    from yt_dlp import YoutubeDL
+
     with YoutubeDL(ydl_opts) as ydl:
         ydl.download([url])
 
@@ -44,6 +95,7 @@ def download_thumbnail(video_id: str, output_path: Path) -> Path | None:
     """
     サムネイル画像をダウンロードして output_path に保存する。
     優先順位: maxresdefault -> sddefault -> hqdefault
+    output_path は main() で expanduser().resolve() 済みのものを渡す。
 
     NOTE:
       YouTube の静的サムネURLを直接叩く方式。
@@ -51,29 +103,57 @@ def download_thumbnail(video_id: str, output_path: Path) -> Path | None:
     """
     sizes = ["maxresdefault", "sddefault", "hqdefault"]
 
-    output_path = output_path.expanduser().resolve()
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-
-    for size in sizes:
-        thumb_url = f"https://img.youtube.com/vi/{video_id}/{size}.jpg"
-        print(f"[THUMB] Try: {thumb_url}")
-        try:
-            with urllib.request.urlopen(thumb_url) as resp:
+    _ensure_dir(output_path.parent)
+
+    # 3 サイズの存在確認 (HEAD) を同時に投げ、優先順位の高いものから採用する
+    with ThreadPoolExecutor(max_workers=len(sizes)) as executor:
+        heads = {
+            size: executor.submit(_THUMB_POOL.request, "HEAD", f"/vi/{video_id}/{size}.jpg")
+            for size in sizes
+        }
+
+        for size in sizes:
+            thumb_path = f"/vi/{video_id}/{size}.jpg"
+            print(f"[THUMB] Try: https://img.youtube.com{thumb_path}")
+            try:
+                status = heads[size].result().status
+            except urllib3.exceptions.HTTPError as e:
+                print(f"[THUMB] Request error ({size}): {e}, try next size")
+                continue
+
+            # 404 に限らず、200 以外は次のサイズを試す
+            if status != 200:
+                print(f"[THUMB] HTTP {status} ({size}), try next size")
+                continue
+
+            try:
+                resp = _THUMB_POOL.request("GET", thumb_path, preload_content=False)
+            except urllib3.exceptions.HTTPError as e:
+                print(f"[THUMB] Request error ({size}): {e}, try next size")
+                continue
+
+            try:
                 if resp.status != 200:
-                    print(f"[THUMB] HTTP {resp.status}, try next size")
+                    print(f"[THUMB] HTTP {resp.status} ({size}), try next size")
+                    resp.drain_conn()
+                    continue
+                # ユーザー指定のパスそのままに書き込み（拡張子はそのまま使う）
+                # レスポンス全体をメモリに溜めず、固定長バッファでファイルへ流し込む
+                # 途中で失敗しても中途半端なファイルが残らないよう、一時ファイルに書いてから置き換える
+                tmp_path = output_path.with_name(output_path.name + ".part")
+                try:
+                    with open(tmp_path, "wb") as out:
+                        shutil.copyfileobj(resp, out, length=THUMB_COPY_BUFSIZE)
+                except urllib3.exceptions.HTTPError as e:
+                    print(f"[THUMB] Read error ({size}): {e}, try next size")
+                    tmp_path.unlink(missing_ok=True)
                     continue
-                data = resp.read()
-        except urllib.error.HTTPError as e:
-            print(f"[THUMB] HTTPError ({size}): {e}")
-            continue
-        except urllib.error.URLError as e:
-            print(f"[THUMB] URLError: {e}")
-            return None
-
-        # ユーザー指定のパスそのままに書き込み（拡張子はそのまま使う）
-        output_path.write_bytes(data)
-        print(f"[THUMB] Saved thumbnail -> {output_path}")
-        return output_path
+                tmp_path.replace(output_path)
+            finally:
+                resp.release_conn()
+
+            print(f"[THUMB] Saved thumbnail -> {output_path}")
+            return output_path
 
     print("[THUMB] No available thumbnail found.")
     return None
@@ -82,7 +162,7 @@ def download_thumbnail(video_id: str, output_path: Path) -> Path | None:
 # ========= CLI 部分 =========
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
-        description="YouTube 動画IDから動画・サムネイルをダウンロードします。"
+        description="YouTube 動画IDから動画・音声・サムネイルをダウンロードします。"
     )
 
     parser.add_argument(
@@ -94,6 +174,10 @@ def parse_args() -> argparse.Namespace:
         "--output-video",
         help="動画ファイルの出力パス（例: outputs/NAME/source_video.mp4）",
     )
+    parser.add_argument(
+        "--output-audio",
+        help="音声ファイル（m4a）の出力パス（例: outputs/NAME/source_audio.m4a）",
+    )
     parser.add_argument(
         "--output-thumb",
         help="サムネイル画像の出力パス（例: outputs/NAME/source_thumb.png）",
@@ -105,20 +189,36 @@ def parse_args() -> argparse.Namespace:
 def main() -> None:
     args = parse_args()
 
-    if not any([args.output_video, args.output_thumb]):
+    if not any([args.output_video, args.output_audio, args.output_thumb]):
         raise SystemExit(
-            "[ERROR] --output-video / --output-thumb のいずれかを指定してください。"
+            "[ERROR] --output-video / --output-audio / --output-thumb のいずれかを指定してください。"
         )
 
     video_id = args.video_id
 
-    saved_video = saved_thumb = None
-
+    # 動画・音声・サムネは別々のリクエストなので並列に取得する
+    # YoutubeDL インスタンスは download_* 内でそれぞれ生成されるのでスレッド間で共有しない
+    jobs = []
     if args.output_video:
-        saved_video = download_video(video_id, Path(args.output_video))
-
+        video_path = Path(args.output_video).expanduser().resolve()
+        jobs.append(("video", download_video, video_path))
+    if args.output_audio:
+        audio_path = Path(args.output_audio).expanduser().resolve()
+        jobs.append(("audio", download_audio, audio_path))
     if args.output_thumb:
-        saved_thumb = download_thumbnail(video_id, Path(args.output_thumb))
+        thumb_path = Path(args.output_thumb).expanduser().resolve()
+        jobs.append(("thumb", download_thumbnail, thumb_path))
+
+    with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+        futures = {
+            name: executor.submit(func, video_id, path)
+            for name, func, path in jobs
+        }
+        results = {name: future.result() for name, future in futures.items()}
+
+    saved_video = results.get("video")
+    saved_audio = results.get("audio")
+    saved_thumb = results.get("thumb")
 
     print("\n========== Download Summary ==========")
     print(f"動画ID        : {video_id}")
@@ -128,6 +228,11 @@ def main() -> None:
     elif args.output_video:
         print("[VIDEO]  ダウンロード失敗")
 
+    if saved_audio:
+        print(f"[AUDIO]  {saved_audio}  ({saved_audio.stat().st_size / (1024*1024):.2f} MB)")
+    elif args.output_audio:
+        print("[AUDIO]  ダウンロード失敗")
+
     if saved_thumb:
         print(f"[THUMB]  {saved_thumb}  ({saved_thumb.stat().st_size / 1024:.1f} KB)")
     elif args.output_thumb:
@@ -16,10 +16,17 @@ URL を --url オプションで渡すと、画面下部に URL を描画しま
 """
 
 import argparse
+import functools
+import shutil
 import subprocess
 import sys
 from pathlib import Path
 import shlex
+import tempfile
+import threading
+import traceback
+
+from PIL import Image, ImageDraw, ImageFont, ImageOps
 
 
 # ===== 設定系（このスクリプトで実際に使うものだけ） =====
@@ -42,7 +49,8 @@ OVERLAY_HEADER_POINTSIZE = 120
 OVERLAY_HEADER_FILL = "#111111"   # 濃いグレー（黒より少し柔らかい）
 OVERLAY_HEADER_STROKE = "#cccccc" # 白い縁取り
 OVERLAY_HEADER_STROKEWIDTH = 20
-OVERLAY_HEADER_POS = "-520+172"   # -gravity North 基準の x+y 位置
+OVERLAY_HEADER_POS_X = -520       # 画像上端中央基準の X オフセット（テキストの中心）
+OVERLAY_HEADER_POS_Y = 172        # 画像上端からの Y 位置（テキストの上端）
 
 # タイトルテキストの描画設定
 OVERLAY_TITLE_POINTSIZE = 180
@@ -50,7 +58,7 @@ OVERLAY_TITLE_FILL = "#ffb347"    # 明るいオレンジ
 OVERLAY_TITLE_STROKE = "#40210f"  # 濃い茶色っぽい枠線
 OVERLAY_TITLE_STROKEWIDTH = 26
 OVERLAY_TITLE_POS_X = -520        # テキストのX中心位置
-OVERLAY_TITLE_POS_Y = 320         # -gravity North 基準のベース Y
+OVERLAY_TITLE_POS_Y = 320         # 画像上端からのベース Y
 OVERLAY_TITLE_LINE_SPACING = -30    # 行間
 
 # サムネイル画像のX位置調整（テキスト座標の半分を指定）
@@ -61,7 +69,8 @@ OVERLAY_URL_POINTSIZE = 80
 OVERLAY_URL_FILL = "#000000"
 OVERLAY_URL_STROKE = "#cccccc"
 OVERLAY_URL_STROKEWIDTH = 20
-OVERLAY_URL_POS = "-520+1888"
+OVERLAY_URL_POS_X = -520
+OVERLAY_URL_POS_Y = 1888
 
 # ピクチャーインピクチャー用の埋め込み動画サイズ＆位置
 EMBED_VIDEO_WIDTH = 720    # 16:9 固定（サムネ用）
@@ -71,28 +80,290 @@ EMBED_VIDEO_HEIGHT = 405   # 高さ固定
 EMBED_CENTER_Y = 740
 EMBED_VIDEO_Y = EMBED_CENTER_Y - EMBED_VIDEO_HEIGHT // 2    # 740 - 202 ≒ 538
 
+# 埋め込み動画のオーバーレイ用 filter_complex（定数だけで決まるので組み立ては 1 回）
+# 入力 0: 背景サムネ / 入力 1: 埋め込み動画
+# x = (画面中央 + 画像用オフセット OVERLAY_THUMB_POS_X) - 動画幅/2
+EMBED_FILTER_COMPLEX = (
+    f"[1:v]scale=-2:{EMBED_VIDEO_HEIGHT}[embed];"
+    f"[0:v][embed]overlay="
+    f"x=(W/2+{OVERLAY_THUMB_POS_X})-w/2:"
+    f"y={EMBED_VIDEO_Y}[outv]"
+)
+
+# x264 エンコード設定（ほぼ静止画なので画質より速度優先）
+VIDEO_X264_PRESET = "veryfast"
+VIDEO_GOP_SIZE = 300       # キーフレーム間隔（フレーム数）
+STILL_VIDEO_FPS = 5        # 埋め込み動画なし（完全な静止画）の場合の出力フレームレート
+STILL_CLIP_SECONDS = 10    # 静止画動画: 一度だけエンコードしてループさせる短いクリップの長さ
+
+# ハードウェアエンコーダの候補（上から順に試し、実際にエンコードできたものを使う）
+# 使えるものが無ければ libx264 にフォールバックする
+USE_HW_ENCODER = True
+HW_VIDEO_ENCODERS = [
+    ("h264_nvenc", ["-preset", "p1", "-pix_fmt", "yuv420p"]),
+    ("h264_qsv", ["-preset", "veryfast", "-pix_fmt", "nv12"]),
+    ("h264_videotoolbox", ["-pix_fmt", "yuv420p"]),
+]
+
+# ffmpeg / ffprobe は起動時に絶対パスへ解決しておく。
+# subprocess は実行ファイルがパス付きで close_fds=False のときだけ fork+exec ではなく posix_spawn を使える
+# （Python が開く fd は PEP 446 で既定が継承不可なので、close_fds=False でも子プロセスには漏れない）
+FFMPEG_BIN = shutil.which("ffmpeg") or "ffmpeg"
+FFPROBE_BIN = shutil.which("ffprobe") or "ffprobe"
+
+# HW エンコーダの試しエンコード用コマンド（エンコーダ名とオプションの前後は固定）
+HW_ENCODER_TEST_INPUT = (
+    FFMPEG_BIN,
+    "-hide_banner",
+    "-loglevel", "error",
+    "-f", "lavfi",
+    "-i", "color=size=256x256:rate=1",
+    "-frames:v", "1",
+)
+HW_ENCODER_TEST_OUTPUT = ("-f", "null", "-")
+
+# run_command: stderr の読み出しサイズと、失敗時に保持しておく末尾のバイト数
+RUN_COMMAND_READ_SIZE = 8192
+RUN_COMMAND_TAIL_BYTES = 4096
+RUN_COMMAND_TERMINATE_TIMEOUT = 5  # 中断時、terminate してから kill するまでの猶予（秒）
+
+# 実行中の run_command の子プロセス（yt_fukikae.py から同じプロセスで呼ばれたとき、失敗時にまとめて止めるため）
+_ACTIVE_PROCS: set[subprocess.Popen] = set()
+_ACTIVE_PROCS_LOCK = threading.Lock()
+_CANCELLED = threading.Event()
+
 # ===== ユーティリティ =====
 
-def run_command(cmd: list[str]) -> None:
-    """サブプロセスでコマンドを実行するだけの簡単なヘルパー。"""
-    printable = " ".join(shlex.quote(str(c)) for c in cmd)
-    print("[RUN]", printable)
+def run_command(cmd: list[str], verbose: bool = False) -> None:
+    """
+    サブプロセスでコマンドを実行するヘルパー。
+    stderr（ffmpeg の進捗やエラー）は届いた分からそのまま流しつつ、末尾だけ保持しておき、
+    失敗時は CalledProcessError.stderr に入れて呼び出し元へ伝える。
+    Ctrl-C などで中断された場合は子プロセスを止めてから例外を伝える（ffmpeg を残さない）。
+    コマンド全体の表示は verbose（--verbose）のときと失敗時だけ組み立てる。
+    """
+    if verbose:
+        print("[RUN]", shlex.join(str(c) for c in cmd), flush=True)
+
+    with _ACTIVE_PROCS_LOCK:
+        if _CANCELLED.is_set():
+            print(f"[WARN] 中止されたため実行しません: {cmd[0]}", flush=True)
+            raise subprocess.CalledProcessError(1, cmd)
+        proc = subprocess.Popen(
+            cmd, stdin=subprocess.DEVNULL, stderr=subprocess.PIPE, close_fds=False
+        )
+        _ACTIVE_PROCS.add(proc)
+
+    tail = b""
     try:
-        subprocess.run(cmd, check=True)
-        print("[OK ]", printable)
-    except subprocess.CalledProcessError as e:
-        print(f"[ERR] command failed (returncode={e.returncode})")
-        raise
+        with proc:
+            try:
+                for chunk in iter(lambda: proc.stderr.read1(RUN_COMMAND_READ_SIZE), b""):
+                    sys.stderr.buffer.write(chunk)
+                    sys.stderr.buffer.flush()
+                    tail = (tail + chunk)[-RUN_COMMAND_TAIL_BYTES:]
+            except BaseException:
+                print(f"\n[WARN] 中断されたためプロセスを終了します: {cmd[0]}", flush=True)
+                _stop_process(proc)
+                raise
+            returncode = proc.wait()
+    finally:
+        with _ACTIVE_PROCS_LOCK:
+            _ACTIVE_PROCS.discard(proc)
+
+    if returncode != 0:
+        print(f"[ERR] command failed (returncode={returncode})")
+        print("[ERR]", shlex.join(str(c) for c in cmd))
+        raise subprocess.CalledProcessError(returncode, cmd, stderr=tail)
+    if verbose:
+        print("[OK ]", cmd[0])
+
+
+def _stop_process(proc: subprocess.Popen) -> None:
+    """
+    子プロセスを terminate し、猶予内に終わらなければ kill する。
+    """
+    proc.terminate()
+    try:
+        proc.wait(timeout=RUN_COMMAND_TERMINATE_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+def cancel_running_commands() -> None:
+    """
+    実行中の run_command の子プロセス（ffmpeg）を止め、以降の run_command も実行せずに失敗させる。
+    yt_fukikae.py が途中で失敗したとき、バックグラウンドのエンコードを待たずに終了するために呼ぶ。
+    """
+    with _ACTIVE_PROCS_LOCK:
+        _CANCELLED.set()
+        procs = list(_ACTIVE_PROCS)
+    for proc in procs:
+        _stop_process(proc)
 
 
-def _format_title_pos(y_offset: int) -> str:
+def probe_audio_codec(audio_path: Path) -> str | None:
+    """
+    ffprobe で先頭の音声ストリームのコーデック名（例: 'aac', 'mp3'）を取得する。
+    取得できなかった場合は None。
+    """
+    cmd = [
+        FFPROBE_BIN,
+        "-v", "error",
+        "-select_streams", "a:0",
+        "-show_entries", "stream=codec_name",
+        "-of", "csv=p=0",
+        str(audio_path),
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True, close_fds=False)
+    if result.returncode != 0:
+        return None
+    codec = result.stdout.strip()
+    return codec or None
+
+
+def probe_duration(media_path: Path) -> float | None:
+    """
+    ffprobe でファイル全体の長さ（秒）を取得する。
+    取得できなかった場合は None。
+    """
+    cmd = [
+        FFPROBE_BIN,
+        "-v", "error",
+        "-show_entries", "format=duration",
+        "-of", "csv=p=0",
+        str(media_path),
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True, close_fds=False)
+    if result.returncode != 0:
+        return None
+    try:
+        return float(result.stdout.strip())
+    except ValueError:
+        return None
+
+
+def _mux_looped_clip(
+    clip_path: Path,
+    audio_path: Path,
+    audio_args: list[str],
+    output_path: Path,
+    verbose: bool = False,
+) -> None:
+    """
+    エンコード済みの映像クリップを -c:v copy でループさせ、音声の長さに合わせて MP4 にまとめる。
+    （映像は再エンコードしない）
+    """
+    cmd = [
+        FFMPEG_BIN,
+        "-y",
+        "-stream_loop", "-1",
+        "-i", str(clip_path),
+        "-i", str(audio_path),
+        "-map", "0:v",
+        "-map", "1:a",
+        "-c:v", "copy",
+        *audio_args,
+        "-movflags", "+faststart",
+        "-shortest",
+        str(output_path),
+    ]
+    run_command(cmd, verbose)
+
+
+@functools.lru_cache(maxsize=None)
+def select_video_encoder_args() -> tuple[str, ...]:
+    """
+    動画エンコード用の ffmpeg 引数（-c:v ... -pix_fmt ...）を返す。
+    HW_VIDEO_ENCODERS を順に 1 フレームだけ試しエンコードし、成功した最初のものを使う。
+    （ffmpeg -encoders に載っていても GPU が無いと使えないため、実際に試す）
+    結果はプロセス内でキャッシュする。
+    """
+    if USE_HW_ENCODER:
+        for name, opts in HW_VIDEO_ENCODERS:
+            test_cmd = [
+                *HW_ENCODER_TEST_INPUT,
+                "-c:v", name,
+                *opts,
+                *HW_ENCODER_TEST_OUTPUT,
+            ]
+            result = subprocess.run(
+                test_cmd,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                close_fds=False,
+            )
+            if result.returncode == 0:
+                print(f"[INFO] ハードウェアエンコーダを使用します: {name}")
+                return ("-c:v", name, *opts)
+
+    return (
+        "-c:v", "libx264",
+        "-preset", VIDEO_X264_PRESET,
+        "-tune", "stillimage",
+        "-threads", "0",
+        "-pix_fmt", "yuv420p",
+    )
+
+
+def _title_pos(y_offset: int) -> tuple[int, int]:
     """
     OVERLAY_TITLE_POS_X, OVERLAY_TITLE_POS_Y と y_offset から
-    ImageMagick 用位置文字列（例: '-260+210'）を作る。
+    タイトルの描画位置 (x, y) を作る。
     """
-    x = OVERLAY_TITLE_POS_X
-    y = OVERLAY_TITLE_POS_Y + y_offset
-    return f"{x:+d}{y:+d}"
+    return OVERLAY_TITLE_POS_X, OVERLAY_TITLE_POS_Y + y_offset
+
+
+@functools.lru_cache(maxsize=None)
+def _load_font(font_path: str, pointsize: int) -> ImageFont.FreeTypeFont:
+    """
+    フォントファイル（.ttc）の読み込みはそれなりに重いので、(パス, サイズ) ごとにキャッシュする。
+    """
+    return ImageFont.truetype(font_path, pointsize)
+
+
+def _draw_text(
+    img: Image.Image,
+    text: str,
+    font_path: str,
+    pointsize: int,
+    fill: str,
+    stroke: str,
+    strokewidth: int,
+    pos: tuple[int, int],
+    line_spacing: int = 0,
+    scale: float = 1.0,
+) -> None:
+    """
+    img の上端中央を基準に、pos = (x オフセット, y) の位置へ縁取り付きテキストを描画する。
+    各行は x を中心に、y を上端として配置する（ImageMagick の -gravity North と同じ配置）。
+    pointsize / strokewidth / pos / line_spacing は背景画像の元解像度基準の値で、
+    縮小済みの img に描くときは scale（縮小率）を掛けて使う。
+
+    ImageMagick では「縁取りあり → 縁取りなし」の 2 回描画で外側だけ縁取りを残していたが、
+    Pillow の stroke_width は外側にだけ太るので strokewidth の半分を指定して 1 回で描く。
+    行間は ImageMagick と同じく (ascent + descent + line_spacing) とする。
+    """
+    font = _load_font(font_path, max(1, round(pointsize * scale)))
+    draw = ImageDraw.Draw(img)
+    ascent, descent = font.getmetrics()
+    line_height = ascent + descent + round(line_spacing * scale)
+    stroke_width = round(strokewidth * scale) // 2
+
+    x = img.width // 2 + round(pos[0] * scale)
+    y = round(pos[1] * scale)
+    # ImageMagick の -annotate と同じく、文字列中の "\n" も改行として扱う
+    for i, line in enumerate(text.replace("\\n", "\n").split("\n")):
+        draw.text(
+            (x, y + i * line_height),
+            line,
+            font=font,
+            fill=fill,
+            stroke_width=stroke_width,
+            stroke_fill=stroke,
+            anchor="ma",
+        )
 
 
 # ===== 背景 + テキスト (+ 画像) → オーバーレイ画像 =====
@@ -111,7 +382,8 @@ def create_overlay_image(
 ) -> Path | None:
     """
     ベースの背景画像にヘッダー・タイトル・URLテキストを描画して output_path に保存する。
-    thumb_image が指定されていれば、あとから指定位置に貼り込む。
+    thumb_image が指定されていれば、1920x1080 に縮小したあと指定位置に貼り込む。
+    描画はすべて Pillow でプロセス内で行う。
 
     戻り値: 生成した画像パス（失敗時は None）
     """
@@ -121,184 +393,251 @@ def create_overlay_image(
         print(f"[WARN] Base image not found: {base_image}")
         return None
 
-    title_pos_str = _format_title_pos(title_offset_y)
+    header_pos = (OVERLAY_HEADER_POS_X, OVERLAY_HEADER_POS_Y)
+    title_pos = _title_pos(title_offset_y)
+    url_pos = (OVERLAY_URL_POS_X, OVERLAY_URL_POS_Y)
 
     print("[OVERLAY] Base image   :", base_image)
     print("[OVERLAY] Output image :", output_path)
     print("[OVERLAY] Font title   :", OVERLAY_FONT_PATH)
     print("[OVERLAY] Font header  :", OVERLAY_FONT2_PATH)
     print("[OVERLAY] Header text  :",
-          f"'{header_text}' size={OVERLAY_HEADER_POINTSIZE} pos={OVERLAY_HEADER_POS}")
+          f"'{header_text}' size={OVERLAY_HEADER_POINTSIZE} pos={header_pos}")
     print("[OVERLAY] Title text   :",
-          f"'{title_text}' size={title_pointsize} pos={title_pos_str}")
+          f"'{title_text}' size={title_pointsize} pos={title_pos}")
     if video_url:
         print("[OVERLAY] Video URL   :",
-              f"'{video_url}' size={OVERLAY_URL_POINTSIZE} pos={OVERLAY_URL_POS}")
+              f"'{video_url}' size={OVERLAY_URL_POINTSIZE} pos={url_pos}")
     print("[OVERLAY] Title color  :", OVERLAY_TITLE_FILL)
     print("[OVERLAY] Title offsetY:", title_offset_y)
     print("[OVERLAY] Title strokewidth:", title_strokewidth)
 
-    # まずは「テキストだけ」を元のやり方で合成
-    cmd: list[str] = [
-        "convert",
-        str(base_image),
-        "-gravity", "North",
-    ]
+    # 背景（2 倍解像度で用意されている）は先に最終出力解像度 1920x1080 に収まるよう縮小し、
+    # テキストは縮小後の画像に縮小率を掛けた座標・サイズで描く（大きな画像に描いてから縮小しない）
+    with Image.open(base_image) as base_src:
+        base_w = base_src.width
+        img = ImageOps.contain(
+            base_src.convert("RGBA"),
+            (VIDEO_THUMB_BASE_W, VIDEO_THUMB_BASE_H),
+            Image.Resampling.LANCZOS,
+        )
+    scale = img.width / base_w
 
     # ヘッダーテキスト
     if header_text:
-        cmd.extend([
-            "-font", OVERLAY_FONT2_PATH,
-            "-pointsize", str(OVERLAY_HEADER_POINTSIZE),
-            "-fill", OVERLAY_HEADER_FILL,
-            "-stroke", OVERLAY_HEADER_STROKE,
-            "-strokewidth", str(OVERLAY_HEADER_STROKEWIDTH),
-            "-annotate", OVERLAY_HEADER_POS, header_text,
-            "-strokewidth", "0",
-            "-annotate", OVERLAY_HEADER_POS, header_text,
-        ])
+        _draw_text(
+            img, header_text,
+            font_path=OVERLAY_FONT2_PATH,
+            pointsize=OVERLAY_HEADER_POINTSIZE,
+            fill=OVERLAY_HEADER_FILL,
+            stroke=OVERLAY_HEADER_STROKE,
+            strokewidth=OVERLAY_HEADER_STROKEWIDTH,
+            pos=header_pos,
+            scale=scale,
+        )
 
     # タイトルテキスト
     if title_text:
-        cmd.extend([
-            "-font", OVERLAY_FONT_PATH,
-            "-pointsize", str(title_pointsize),
-            "-fill", OVERLAY_TITLE_FILL,
-            "-stroke", OVERLAY_TITLE_STROKE,
-            "-strokewidth", str(title_strokewidth),
-            "-interline-spacing", str(title_line_spacing),
-            "-annotate", title_pos_str, title_text,
-            "-strokewidth", "0",
-            "-annotate", title_pos_str, title_text,
-        ])
+        _draw_text(
+            img, title_text,
+            font_path=OVERLAY_FONT_PATH,
+            pointsize=title_pointsize,
+            fill=OVERLAY_TITLE_FILL,
+            stroke=OVERLAY_TITLE_STROKE,
+            strokewidth=title_strokewidth,
+            pos=title_pos,
+            line_spacing=title_line_spacing,
+            scale=scale,
+        )
 
     # 元動画URLテキスト
     if video_url:
-        cmd.extend([
-            "-font", OVERLAY_FONT2_PATH,
-            "-pointsize", str(OVERLAY_URL_POINTSIZE),
-            "-fill", OVERLAY_URL_FILL,
-            "-stroke", OVERLAY_URL_STROKE,
-            "-strokewidth", str(OVERLAY_URL_STROKEWIDTH),
-            "-annotate", OVERLAY_URL_POS, video_url,
-            "-strokewidth", "0",
-            "-annotate", OVERLAY_URL_POS, video_url,
-        ])
-
-    # 最終出力解像度を固定（1920x1080）
-    cmd.extend([
-        "-filter", "Lanczos",
-        "-resize", f"{VIDEO_THUMB_BASE_W}x{VIDEO_THUMB_BASE_H}",
-        str(output_path),
-    ])
-
-    run_command(cmd)
-    print("[DONE] Overlay image (text only):", output_path)
+        _draw_text(
+            img, video_url,
+            font_path=OVERLAY_FONT2_PATH,
+            pointsize=OVERLAY_URL_POINTSIZE,
+            fill=OVERLAY_URL_FILL,
+            stroke=OVERLAY_URL_STROKE,
+            strokewidth=OVERLAY_URL_STROKEWIDTH,
+            pos=url_pos,
+            scale=scale,
+        )
 
-    # ここから YouTube サムネ画像を貼り込む
+    # YouTube サムネ画像を貼り込む（リサイズ後の 1920x1080 基準）
     if thumb_image is not None:
-        if not thumb_image.exists():
+        if thumb_image.exists():
+            with Image.open(thumb_image) as thumb_src:
+                thumb = ImageOps.contain(
+                    thumb_src.convert("RGBA"),
+                    (EMBED_VIDEO_WIDTH, EMBED_VIDEO_HEIGHT),
+                    Image.Resampling.LANCZOS,
+                )
+            # 定数 OVERLAY_THUMB_POS_X を使用して配置（上端中央基準）
+            thumb_x = (img.width - thumb.width) // 2 + OVERLAY_THUMB_POS_X
+            img.alpha_composite(thumb, (thumb_x, EMBED_VIDEO_Y))
+        else:
             print(f"[WARN] Thumb image not found: {thumb_image} (サムネ合成をスキップします)")
-            return output_path
+            thumb_image = None
 
-        print("[STEP] Add thumb image into overlay")
-        
-        # 定数 OVERLAY_THUMB_POS_X を使用して配置
-        cmd2: list[str] = [
-            "convert",
-            str(output_path),
-            "(",
-            str(thumb_image),
-            "-filter", "Lanczos",
-            "-resize", f"{EMBED_VIDEO_WIDTH}x{EMBED_VIDEO_HEIGHT}",
-            ")",
-            "-gravity", "North", # 背景画像の中心(North基準)
-            "-geometry", f"{OVERLAY_THUMB_POS_X:+d}+{EMBED_VIDEO_Y}",
-            "-compose", "over",
-            "-composite",
-            str(output_path),
-        ]
-        run_command(cmd2)
-        print("[DONE] Thumb image composited:", output_path)
+    img.save(output_path)
+    print("[DONE] Overlay image:", output_path)
+    if thumb_image is not None:
+        print("[DONE] Thumb image composited:", thumb_image)
 
     return output_path
 
 
 # ===== オーバーレイ画像 + （埋め込み動画） + 音声 → 動画 =====
 
+def create_embed_clip(
+    image_path: Path,
+    embed_video_path: Path,
+    clip_path: Path,
+    duration: float,
+    verbose: bool = False,
+) -> None:
+    """
+    背景 image_path に embed_video_path の映像を埋め込んだ映像を、duration 秒（元動画 1 周分）だけエンコードする。
+    音声は含めない。最終動画ではこのクリップを -c:v copy でループさせる。
+    途中で失敗・中断しても壊れたクリップが残らないよう、一時ファイルにエンコードしてから置き換える。
+    """
+    print("[STEP] Encode embedded-video clip (one loop)")
+
+    # 拡張子で出力形式が決まるので、.mp4 のまま一時ファイル名にする
+    part_path = clip_path.with_name(f"{clip_path.stem}.part{clip_path.suffix}")
+    cmd = [
+        FFMPEG_BIN,
+        "-y",
+        "-loop", "1",
+        "-i", str(image_path),
+        "-i", str(embed_video_path),
+        "-filter_complex", EMBED_FILTER_COMPLEX,
+        "-map", "[outv]",
+        "-t", f"{duration:.3f}",
+        *select_video_encoder_args(),
+        "-g", str(VIDEO_GOP_SIZE),
+        "-an",
+        str(part_path),
+    ]
+    try:
+        run_command(cmd, verbose)
+    except BaseException:
+        part_path.unlink(missing_ok=True)
+        raise
+    part_path.replace(clip_path)
+
+    print("[DONE] Embedded-video clip:", clip_path)
+
+
 def create_video_from_audio(
     image_path: Path,
     audio_path: Path,
     output_path: Path,
     embed_video_path: Path | None = None,
+    embed_clip_path: Path | None = None,
+    verbose: bool = False,
 ) -> None:
     """
     1枚絵 image_path と audio_path から mp4 を生成する。
     embed_video_path が指定されていれば、その映像を中央付近にピクチャーインピクチャーで埋め込む。
     （埋め込み動画の音声は使用しない）
+    embed_clip_path に create_embed_clip で作成済みのクリップがあれば、映像はエンコードせずにそれをループさせる。
     """
     print("[STEP] Create MP4 video from audio and image")
 
+    # 入力音声がすでに AAC（m4a など）なら再エンコードせずそのまま MP4 に入れる
+    audio_codec = probe_audio_codec(audio_path)
+    if audio_codec == "aac":
+        print("[INFO] 音声は AAC のため再エンコードせずコピーします")
+        audio_args = ["-c:a", "copy"]
+    else:
+        audio_args = ["-c:a", "aac", "-b:a", "192k"]
+
+    video_args = select_video_encoder_args()
+
     if embed_video_path is not None and embed_video_path.exists():
         print(f"[INFO] 埋め込み動画を使用します: {embed_video_path}")
+
+        if embed_clip_path is not None and embed_clip_path.exists():
+            print(f"[INFO] エンコード済みの埋め込みクリップを使用します: {embed_clip_path}")
+            _mux_looped_clip(embed_clip_path, audio_path, audio_args, output_path, verbose)
+            print("[DONE] Create video:", output_path)
+            return
+
+        # 埋め込み動画はループさせるので、合成後の映像は「元動画 1 周分」の繰り返しになる。
+        # 音声の方が長いときは 1 周分だけエンコードし、あとはそのクリップを -c:v copy でループさせる
+        embed_duration = probe_duration(embed_video_path)
+        audio_duration = probe_duration(audio_path)
+        if (
+            embed_duration is not None
+            and audio_duration is not None
+            and audio_duration > embed_duration
+        ):
+            print(
+                f"[INFO] 音声 ({audio_duration:.1f}s) が埋め込み動画 ({embed_duration:.1f}s) より長いため、"
+                "1 周分だけエンコードしてループさせます"
+            )
+            with tempfile.TemporaryDirectory(prefix="embed_", dir=output_path.parent) as tmp_dir:
+                tmp_clip_path = Path(tmp_dir) / "embed.mp4"
+                create_embed_clip(image_path, embed_video_path, tmp_clip_path, embed_duration, verbose)
+                _mux_looped_clip(tmp_clip_path, audio_path, audio_args, output_path, verbose)
+
+            print("[DONE] Create video:", output_path)
+            return
+
         # 0: 背景サムネ（ループ）
         # 1: オリジナル動画（映像だけ使う、ループ）
         # 2: TTS 音声
 
-        # ffmpegの計算式でも OVERLAY_THUMB_POS_X を使用
-        # x = (画面中央 + 画像用オフセット) - 動画幅/2
-        filter_complex = (
-            f"[1:v]scale=-2:{EMBED_VIDEO_HEIGHT}[embed];"
-            f"[0:v][embed]overlay="
-            f"x=(W/2+{OVERLAY_THUMB_POS_X})-w/2:"
-            f"y={EMBED_VIDEO_Y}[outv]"
-        )
-
         cmd = [
-            "ffmpeg",
+            FFMPEG_BIN,
             "-y",
             "-loop", "1",
             "-i", str(image_path),
             "-stream_loop", "-1",
             "-i", str(embed_video_path),
             "-i", str(audio_path),
-            "-filter_complex", filter_complex,
+            "-filter_complex", EMBED_FILTER_COMPLEX,
             "-map", "[outv]",
             "-map", "2:a",
-            "-c:v", "libx264",
-            "-tune", "stillimage",
-            "-c:a", "aac",
-            "-b:a", "192k",
-            "-pix_fmt", "yuv420p",
+            *video_args,
+            "-g", str(VIDEO_GOP_SIZE),
+            *audio_args,
+            "-movflags", "+faststart",
             "-shortest",
             str(output_path),
         ]
+        run_command(cmd, verbose)
     else:
         if embed_video_path is not None:
             print(f"[WARN] 埋め込み動画が見つかりませんでした: {embed_video_path}  -> 通常の静止画動画として作成します。")
 
-        cmd = [
-            "ffmpeg",
-            "-y",
-            "-loop", "1",
-            "-i", str(image_path),
-            "-i", str(audio_path),
-            "-c:v", "libx264",
-            "-tune", "stillimage",
-            "-c:a", "aac",
-            "-b:a", "192k",
-            "-pix_fmt", "yuv420p",
-            "-shortest",
-            str(output_path),
-        ]
+        # 静止画は STILL_CLIP_SECONDS 秒の短いクリップとして 1 回だけエンコードし、
+        # 本番はそのクリップを -c:v copy でループさせて音声と合わせる（映像の再エンコードなし）。
+        # クリップは 1 GOP（I フレーム 1 枚 + ほぼ空の P フレーム）なので、ループしてもサイズは小さい。
+        with tempfile.TemporaryDirectory(prefix="still_", dir=output_path.parent) as tmp_dir:
+            still_clip_path = Path(tmp_dir) / "still.mp4"
+            cmd_still = [
+                FFMPEG_BIN,
+                "-y",
+                "-loop", "1",
+                "-framerate", str(STILL_VIDEO_FPS),
+                "-i", str(image_path),
+                "-t", str(STILL_CLIP_SECONDS),
+                *video_args,
+                "-g", str(VIDEO_GOP_SIZE),
+                "-an",
+                str(still_clip_path),
+            ]
+            run_command(cmd_still, verbose)
+            _mux_looped_clip(still_clip_path, audio_path, audio_args, output_path, verbose)
 
-    run_command(cmd)
     print("[DONE] Create video:", output_path)
 
 
 # ===== 引数処理・エントリポイント =====
 
-def parse_args() -> argparse.Namespace:
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description=(
             "背景画像にテキストを合成し、その画像と音声から1枚絵のmp4動画を生成します。"
@@ -366,7 +705,7 @@ def parse_args() -> argparse.Namespace:
         "--title-line-spacing",
         type=int,
         default=OVERLAY_TITLE_LINE_SPACING,
-        help=f"タイトル行間（ImageMagick -interline-spacing, デフォルト: {OVERLAY_TITLE_LINE_SPACING}）",
+        help=f"タイトル行間（ピクセル, ImageMagick の -interline-spacing 相当, デフォルト: {OVERLAY_TITLE_LINE_SPACING}）",
     )
     parser.add_argument(
         "--title-offset-y",
@@ -388,11 +727,33 @@ def parse_args() -> argparse.Namespace:
         help="動画を作らず、テキスト合成済みのサムネ画像だけ生成する",
     )
 
-    return parser.parse_args()
+    # 実行コマンドの表示
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="ffmpeg などの実行コマンドを毎回表示する（省略時は失敗したときだけ表示）",
+    )
+
+    # 埋め込み動画 1 周分のクリップ（音声より先に作っておき、最終動画では映像をエンコードしない）
+    parser.add_argument(
+        "--embed-clip",
+        help=(
+            "背景 + 埋め込み動画 1 周分をエンコードしたクリップのパス。"
+            "--image-only と一緒に指定するとサムネに続けて作成し、動画作成時は既にあれば映像を再エンコードせずにループさせる"
+        ),
+    )
+    # 生成済みサムネの再利用（別プロセスで先に --image-only 実行済みの場合など）
+    parser.add_argument(
+        "--reuse-thumb",
+        action="store_true",
+        help="--output-thumb のファイルが既にあれば、作り直さずにそのまま動画の背景として使う",
+    )
+
+    return parser.parse_args(argv)
 
 
-def main() -> None:
-    args = parse_args()
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
 
     image_path = Path(args.image).expanduser()
     audio_path = Path(args.audio).expanduser()
@@ -427,6 +788,7 @@ def main() -> None:
         overlay_path = Path.cwd() / VIDEO_THUMB_FINAL_NAME
 
     embed_video_path = Path(args.embed_video).expanduser() if args.embed_video else None
+    embed_clip_path = Path(args.embed_clip).expanduser() if args.embed_clip else None
 
     print("[INFO] 背景画像 :", image_path)
     if not args.image_only:
@@ -445,25 +807,37 @@ def main() -> None:
         print("[INFO] モード   : サムネだけ生成 (--image-only)")
 
     # 1) 背景 + テキスト + URL (+ 画像) からオーバーレイ画像を作成
-    overlay_image = create_overlay_image(
-        base_image=image_path,
-        header_text=args.header,
-        title_text=args.title,
-        title_pointsize=args.title_pointsize,
-        title_line_spacing=args.title_line_spacing,
-        title_offset_y=args.title_offset_y,
-        title_strokewidth=args.title_strokewidth,
-        output_path=overlay_path,
-        video_url=args.url or None,
-        thumb_image=thumb_image_path,
-    )
+    if args.reuse_thumb and overlay_path.exists():
+        print("[INFO] 生成済みのオーバーレイ画像を使用します (--reuse-thumb):", overlay_path)
+        overlay_image = overlay_path
+    else:
+        overlay_image = create_overlay_image(
+            base_image=image_path,
+            header_text=args.header,
+            title_text=args.title,
+            title_pointsize=args.title_pointsize,
+            title_line_spacing=args.title_line_spacing,
+            title_offset_y=args.title_offset_y,
+            title_strokewidth=args.title_strokewidth,
+            output_path=overlay_path,
+            video_url=args.url or None,
+            thumb_image=thumb_image_path,
+        )
     if overlay_image is None:
         print("[FATAL] オーバーレイ画像の作成に失敗しました。")
         sys.exit(1)
 
-    # image-only モードならここで終了
+    # image-only モードならここで終了（--embed-clip があれば埋め込みクリップまで作る）
     if args.image_only:
         print(f"[RESULT] サムネ画像のみ生成しました: {overlay_image}")
+        if embed_clip_path is not None and embed_video_path is not None and embed_video_path.exists():
+            embed_duration = probe_duration(embed_video_path)
+            if embed_duration is None:
+                print(f"[WARN] 埋め込み動画の長さを取得できないため、クリップは作成しません: {embed_video_path}")
+            else:
+                create_embed_clip(
+                    overlay_image, embed_video_path, embed_clip_path, embed_duration, args.verbose
+                )
         return
 
     # 2) オーバーレイ画像 + （埋め込み動画） + 音声 から動画を作成
@@ -472,12 +846,29 @@ def main() -> None:
         audio_path=audio_path,
         output_path=output_path,
         embed_video_path=embed_video_path,
+        embed_clip_path=embed_clip_path,
+        verbose=args.verbose,
     )
 
 
-if __name__ == "__main__":
+def run(argv: list[str] | None = None) -> int:
+    """
+    main() を実行して終了コードを返す（sys.exit や例外も終了コードに変換する）。
+    yt_fukikae.py から、インタプリタを起動し直さずに同じプロセスで呼ぶための入口。
+    """
     try:
-        main()
+        main(argv)
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        print(e.code)
+        return 1
     except Exception as e:
         print(f"[FATAL] 予期しないエラー: {e}")
-        sys.exit(1)
\ No newline at end of file
+        traceback.print_exc()
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
\ No newline at end of file
@@ -0,0 +1,50 @@
+// ==========================================
+//  pipeline_worker.js
+//  文字起こし・翻訳・TTS を 1 つの Node プロセスで続けて実行するための常駐ワーカー
+//  （yt_fukikae.py から起動される。ステージごとに node を起動し直すコストを省く）
+//
+//  stdin : 1 行 1 JSON の要求   {"op": "transcribe", "argv": ["in.m4a", "out.txt", "work/"]}
+//  stdout: 1 行 1 JSON の応答   {"ok": true} / {"ok": false, "error": "..."}
+//  各スクリプトのログは stderr に流す（stdout は応答専用）
+// ==========================================
+import readline from "readline";
+import { main as transcribe } from "./transcribe.js";
+import { main as translateToJa } from "./translate_to_ja.js";
+import { main as textToSpeech } from "./text_to_speech.js";
+
+// op 名は各スクリプトのファイル名（拡張子なし）に合わせる
+const OPS = {
+  transcribe: transcribe,
+  translate_to_ja: translateToJa,
+  text_to_speech: textToSpeech,
+};
+
+// 応答と混ざらないよう、console.log / console.info の出力先を stderr にする
+console.log = console.error;
+console.info = console.error;
+
+const reply = (message) => {
+  process.stdout.write(JSON.stringify(message) + "\n");
+};
+
+const rl = readline.createInterface({ input: process.stdin, crlfDelay: Infinity });
+
+// 要求は 1 件ずつ順番に処理する（ステージ間に依存関係があるため）
+for await (const line of rl) {
+  if (!line.trim()) continue;
+
+  try {
+    const { op, argv = [] } = JSON.parse(line);
+    const fn = OPS[op];
+    if (!fn) throw new Error(`未知の op です: ${op}`);
+
+    await fn(argv);
+    reply({ ok: true });
+  } catch (err) {
+    console.error("[pipeline_worker] エラー:", err);
+    reply({ ok: false, error: String(err?.message ?? err) });
+  }
+}
+
+// stdin が閉じられたら終了する（keep-alive の接続などが残っていても待たない）
+process.exit(0);
@@ -1,11 +1,14 @@
 import "dotenv/config";
 import fs from "fs";
 import path from "path";
+import { Readable } from "stream";
+import { pipeline } from "stream/promises";
 import os from "os"; // 一時ディレクトリ用に追加
 import OpenAI from "openai";
 import { RecursiveCharacterTextSplitter } from "@langchain/textsplitters";
 import ffmpeg from "fluent-ffmpeg";
 import { parseArgs } from "node:util";
+import { pathToFileURL } from "url";
 
 // ==========================================
 //  Configuration (設定)
@@ -26,46 +29,55 @@ const CONFIG = {
       targetTP: -1.5, // True Peak
       targetLRA: 11   // Loudness Range
     },
-    paddingDuration: 1.0 // 前後の無音秒数
+    paddingDuration: 1.0, // 前後の無音秒数
+    sampleRate: 48000,    // 出力サンプルレート（loudnorm は内部で 192kHz に上げるため明示する）
+    aacBitrate: "192k"    // 出力が .m4a / .aac のときのビットレート
   },
   processing: {
-    parallel: 3 // デフォルトの並列実行数
+    parallel: 3, // デフォルトの並列実行数
+    writeChunkSize: 1 << 20 // 音声ストリーム書き出し時のバッファサイズ (1MB)
   }
 };
 
 // コマンドライン引数の解析
-let args = {};
-try {
-  const { values, positionals } = parseArgs({
-    options: {
-      voice: { type: "string" },
-      speed: { type: "string" },
-      model: { type: "string" },
-      chunk: { type: "string" },
-      output: { type: "string", short: "o" },   // 出力パス (必須)
-      "debug-dir": { type: "string" },          // デバッグ用出力ディレクトリ (指定時のみ保存)
-      parallel: { type: "string", short: "p" }, // 並列数
-    },
-    allowPositionals: true,
-  });
+// 引数による上書きは呼び出しごとに CONFIG のコピーへ適用する（pipeline_worker.js で複数回呼ばれても混ざらないように）
+function parseCliArgs(argv) {
+  const config = structuredClone(CONFIG);
+  let args = {};
+  try {
+    const { values, positionals } = parseArgs({
+      args: argv,
+      options: {
+        voice: { type: "string" },
+        speed: { type: "string" },
+        model: { type: "string" },
+        chunk: { type: "string" },
+        output: { type: "string", short: "o" },   // 出力パス (必須)
+        "debug-dir": { type: "string" },          // デバッグ用出力ディレクトリ (指定時のみ保存)
+        parallel: { type: "string", short: "p" }, // 並列数
+      },
+      allowPositionals: true,
+    });
 
-  args = { ...values, input: positionals[0] };
+    args = { ...values, input: positionals[0] };
 
-  // "--debug-dir" を内部名 debugDir にマッピングしておく
-  if (values["debug-dir"]) {
-    args.debugDir = values["debug-dir"];
-  }
+    // "--debug-dir" を内部名 debugDir にマッピングしておく
+    if (values["debug-dir"]) {
+      args.debugDir = values["debug-dir"];
+    }
 
-  // 引数で指定があればCONFIGを上書き
-  if (args.voice) CONFIG.tts.voice = args.voice;
-  if (args.speed) CONFIG.tts.speed = parseFloat(args.speed);
-  if (args.model) CONFIG.tts.model = args.model;
-  if (args.chunk) CONFIG.text.chunkSize = parseInt(args.chunk, 10);
-  if (args.parallel) CONFIG.processing.parallel = parseInt(args.parallel, 10);
+    // 引数で指定があればCONFIGを上書き
+    if (args.voice) config.tts.voice = args.voice;
+    if (args.speed) config.tts.speed = parseFloat(args.speed);
+    if (args.model) config.tts.model = args.model;
+    if (args.chunk) config.text.chunkSize = parseInt(args.chunk, 10);
+    if (args.parallel) config.processing.parallel = parseInt(args.parallel, 10);
 
-} catch (e) {
-  console.warn("引数解析エラー:", e.message);
-  process.exit(1);
+  } catch (e) {
+    console.warn("引数解析エラー:", e.message);
+    throw e;
+  }
+  return { args, config };
 }
 
 const openai = new OpenAI();
@@ -106,8 +118,14 @@ class FileManager {
     await fs.promises.writeFile(this.getFilePath(fileName), content);
   }
 
-  async saveBuffer(fileName, buffer) {
-    await fs.promises.writeFile(this.getFilePath(fileName), buffer);
+  /**
+   * Web ReadableStream をバッファリングせずにそのままファイルへ書き出す
+   */
+  async saveStream(fileName, webStream) {
+    await pipeline(
+      Readable.fromWeb(webStream),
+      fs.createWriteStream(this.getFilePath(fileName), { highWaterMark: CONFIG.processing.writeChunkSize })
+    );
   }
 
   /**
@@ -127,6 +145,28 @@ class FileManager {
     });
   }
 
+  /**
+   * ファイルを移動する（同一ファイルシステムなら rename だけで済む）
+   * 作業ディレクトリが別デバイス（tmpfs など）の場合は copyFile にフォールバック
+   * （カーネル内でコピーされる: copy_file_range / 対応 FS なら reflink）
+   * copyFile が使えない環境ではストリームコピーにする
+   */
+  async _moveFile(src, dest) {
+    try {
+      await fs.promises.rename(src, dest);
+      return;
+    } catch (e) {
+      if (e.code !== "EXDEV") throw e;
+    }
+
+    try {
+      await fs.promises.copyFile(src, dest, fs.constants.COPYFILE_FICLONE);
+    } catch (e) {
+      console.warn(`copyFile に失敗したためストリームコピーします: ${e.message}`);
+      await this._copyFileStream(src, dest);
+    }
+  }
+
   /**
    * 処理完了後の保存とクリーンアップ
    * @param {string} finalFileName - 生成された結合ファイルのファイル名
@@ -135,11 +175,8 @@ class FileManager {
   async finalize(finalFileName, destPath) {
     const sourcePath = this.getFilePath(finalFileName);
 
-    // 1. 最終成果物をユーザー指定のパスへコピー
-    console.log(`ファイルを保存中: ${destPath}`);
-    await this._copyFileStream(sourcePath, destPath);
-
-    // 2. デバッグ出力先が指定されている場合、作業内容をバックアップ
+    // 1. デバッグ出力先が指定されている場合、作業内容をバックアップ
+    //    （最終成果物は次で移動してしまうので、その前にコピーしておく）
     if (this.debugOutputDir) {
       const timestamp = new Date().toISOString().replace(/[-:T.]/g, "").slice(0, 14);
       const debugDirName = `tts-debug-${timestamp}`;
@@ -149,6 +186,10 @@ class FileManager {
       await this.copyDirectory(this.workDir, debugPath);
     }
 
+    // 2. 最終成果物をユーザー指定のパスへ移動（作業ディレクトリはこの後消すのでコピー不要）
+    console.log(`ファイルを保存中: ${destPath}`);
+    await this._moveFile(sourcePath, destPath);
+
     // 3. 作業ディレクトリの削除 (クリーンアップ)
     await this.cleanup();
   }
@@ -218,64 +259,64 @@ const AudioGenerator = {
       input: text,
       speed: config.speed,
     });
-    return Buffer.from(await mp3.arrayBuffer());
+    // arrayBuffer() で全体を溜めず、呼び出し側でストリームのまま書き出す
+    return mp3.body;
   }
 };
 
 /**
- * FFmpeg 音声処理（無音生成・結合・正規化）
+ * FFmpeg 音声処理（結合・無音パディング・正規化）
  */
 const AudioProcessor = {
-  createSilence(referenceFile, outputFile, duration) {
-    return new Promise((resolve, reject) => {
-      ffmpeg(referenceFile)
-        .audioFilters('volume=0')
-        .duration(duration)
-        .save(outputFile)
-        .on('end', () => resolve())
-        .on('error', reject);
-    });
-  },
-
   async mergeAndNormalize(inputFiles, outputPath, config) {
-    const silencePath = path.join(path.dirname(outputPath), "silence_padding.mp3");
-    
-    try {
-      console.log(`\nフォーマット調整用の無音ファイルを生成中...`);
-      await this.createSilence(inputFiles[0], silencePath, config.paddingDuration);
-
-      const filesToConcat = [silencePath, ...inputFiles, silencePath];
-      console.log(`結合・ノーマライズ中... (全${filesToConcat.length}ファイル)`);
-
-      await new Promise((resolve, reject) => {
-        const command = ffmpeg();
-        filesToConcat.forEach(file => command.input(file));
-
-        const filterInput = filesToConcat.map((_, i) => `[${i}:0]`).join('');
-        const norm = config.normalization;
-        const complexFilter = `${filterInput}concat=n=${filesToConcat.length}:v=0:a=1[cat];[cat]loudnorm=I=${norm.targetI}:TP=${norm.targetTP}:LRA=${norm.targetLRA}[out]`;
-
-        command
-          .complexFilter(complexFilter)
-          .map('[out]')
-          .audioCodec('libmp3lame')
-          .save(outputPath)
-          .on('end', resolve)
-          .on('error', reject);
-      });
-
-    } finally {
-      if (fs.existsSync(silencePath)) {
-        fs.unlinkSync(silencePath);
+    console.log(`結合・ノーマライズ中... (全${inputFiles.length}ファイル)`);
+
+    // パートはすべて同じ TTS 設定の mp3 なので、concat demuxer で 1 入力として順に読む
+    // （パート数だけ入力・デコーダーを同時に開かずに済む）
+    const listPath = path.join(path.dirname(outputPath), "concat_list.txt");
+    const listBody = inputFiles
+      .map(file => `file '${path.resolve(file).replace(/'/g, "'\\''")}'`)
+      .join("\n");
+    await fs.promises.writeFile(listPath, `${listBody}\n`);
+
+    await new Promise((resolve, reject) => {
+      const command = ffmpeg()
+        .input(listPath)
+        .inputOptions(['-f', 'concat', '-safe', '0']);
+
+      // 前後の無音は一時ファイルを作らず、フィルタ内で adelay / apad により付与する
+      const paddingMs = Math.round(config.paddingDuration * 1000);
+      const norm = config.normalization;
+      // loudnorm は測定値を渡さない 1 パス（dynamic）モードで使う
+      const complexFilter = `[0:a]adelay=delays=${paddingMs}:all=1,apad=pad_dur=${config.paddingDuration},loudnorm=I=${norm.targetI}:TP=${norm.targetTP}:LRA=${norm.targetLRA}:linear=false[out]`;
+
+      // 出力拡張子が .m4a / .aac なら AAC で書き出す（最終動画の mux で -c:a copy にでき、再エンコードが不要になる）
+      const isAac = /\.(m4a|aac)$/i.test(outputPath);
+
+      command
+        .complexFilter(complexFilter)
+        .map('[out]')
+        .outputOptions(['-threads', '0', '-ar', String(config.sampleRate)]);
+      if (isAac) {
+        command.audioCodec('aac').audioBitrate(config.aacBitrate);
+      } else {
+        command.audioCodec('libmp3lame');
       }
-    }
+      command
+        .save(outputPath)
+        .on('end', resolve)
+        .on('error', reject);
+    });
   }
 };
 
 // ==========================================
 //  Main Flow (メイン処理)
 // ==========================================
-async function main() {
+// argv: コマンドライン引数（pipeline_worker.js からは同じ形の配列が渡される）
+// 失敗時は例外を投げる（直接実行時は終了コード 1 で終わる）
+export async function main(argv = process.argv.slice(2)) {
+  const { args, config } = parseCliArgs(argv);
   const fileManager = new FileManager(args.debugDir);
 
   try {
@@ -287,7 +328,7 @@ async function main() {
       console.error("エラー: 入力ファイルと出力先の指定は必須です。");
       console.error("使用法: node text_to_speech.js <入力ファイル> --output <出力パス> [options]");
       console.error("例: node text_to_speech.js input.txt --output result.mp3 --debug-dir ./debug_output --parallel 5");
-      process.exit(1);
+      throw new Error("入力ファイルまたは出力先が指定されていません");
     }
 
     // 1. 初期化と準備
@@ -299,11 +340,11 @@ async function main() {
     console.log(`作業ディレクトリ(一時): ${workDir}`);
     if (args.debugDir) console.log(`★デバッグモード有効: 完了後に ${args.debugDir} へログを保存します`);
 
-    console.log(`設定: Model=${CONFIG.tts.model}, Voice=${CONFIG.tts.voice}, Speed=${CONFIG.tts.speed}, Chunk=${CONFIG.text.chunkSize}, Parallel=${CONFIG.processing.parallel}`);
+    console.log(`設定: Model=${config.tts.model}, Voice=${config.tts.voice}, Speed=${config.tts.speed}, Chunk=${config.text.chunkSize}, Parallel=${config.processing.parallel}`);
 
     // 2. テキスト読み込み・分割
     const rawText = await TextProcessor.readInput(inputFilePath);
-    const docs = await TextProcessor.splitText(rawText, CONFIG.text);
+    const docs = await TextProcessor.splitText(rawText, config.text);
     console.log(`テキストを ${docs.length} パートに分割しました。`);
 
     // 結果格納用配列（インデックス順を保持するため確保）
@@ -326,9 +367,9 @@ async function main() {
         await fileManager.saveText(textFileName, partText);
 
         // 音声生成・保存
-        const audioBuffer = await AudioGenerator.generate(partText, CONFIG.tts);
+        const audioStream = await AudioGenerator.generate(partText, config.tts);
         const audioFileName = `part_${seqNum}.mp3`;
-        await fileManager.saveBuffer(audioFileName, audioBuffer);
+        await fileManager.saveStream(audioFileName, audioStream);
         
         // 結果を正しい位置に保存
         chunkResults[index] = fileManager.getFilePath(audioFileName);
@@ -336,7 +377,7 @@ async function main() {
     };
 
     // ワーカー: キューが空になるまで処理し続ける
-    const concurrency = CONFIG.processing.parallel;
+    const concurrency = config.processing.parallel;
     const workers = new Array(Math.min(concurrency, queue.length)).fill(null).map(async (_, workerId) => {
         while (queue.length > 0) {
             const item = queue.shift();
@@ -359,11 +400,12 @@ async function main() {
 
     // 4. 結合・仕上げ
     if (audioFileNames.length > 0) {
-      const tempFinalName = "combined_temp.mp3";
+      // 出力形式（mp3 / m4a）は最終出力パスの拡張子に合わせる
+      const tempFinalName = `combined_temp${path.extname(outputFilePath) || ".mp3"}`;
       const tempFinalPath = fileManager.getFilePath(tempFinalName);
 
       // 一時ディレクトリ内で結合を実行
-      await AudioProcessor.mergeAndNormalize(audioFileNames, tempFinalPath, CONFIG.audio);
+      await AudioProcessor.mergeAndNormalize(audioFileNames, tempFinalPath, config.audio);
       
       // 最終処理 (指定パスへの移動 + デバッグ保存 + 掃除)
       await fileManager.finalize(tempFinalName, outputFilePath);
@@ -382,8 +424,11 @@ async function main() {
     }
     // エラー時も掃除を試みる
     await fileManager.cleanup();
-    process.exit(1);
+    throw error;
   }
 }
 
-main();
\ No newline at end of file
+// 直接実行されたときだけ起動する（pipeline_worker.js から import された場合は呼ばれるまで何もしない）
+if (import.meta.url === pathToFileURL(process.argv[1]).href) {
+  main().catch(() => process.exit(1));
+}
\ No newline at end of file
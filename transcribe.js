@@ -1,7 +1,9 @@
 import OpenAI from "openai";
 import fs from "fs";
+import os from "os";
 import path from "path";
 import { spawn } from "child_process";
+import { pathToFileURL } from "url";
 import "dotenv/config";
 import { File } from "node:buffer";
 
@@ -23,12 +25,22 @@ const SILENCE_NOISE_DB = "-30dB";  // 無音とみなす音量しきい値
 const SILENCE_MIN_DURATION_SEC = 0.5; // これ以上続いた無音を切れ目候補にする
 const SILENCE_FILTER = `silencedetect=noise=${SILENCE_NOISE_DB}:d=${SILENCE_MIN_DURATION_SEC}`;
 
+// silencedetect ログの解析用（silence_end と silence_duration は同じ行に出る）
+// start / end をまとめて 1 つの正規表現でログ全体を 1 回だけ走査する
+const SILENCE_EVENT_RE = /silence_(start|end):\s*([0-9.]+)(?:[^\n]*?silence_duration:\s*([0-9.]+))?/g;
+
+// 長い音声の無音検出は時間で区切って並列に実行する（silencedetect 自体は 1 スレッドで動くため）
+const SILENCE_PARALLEL_MIN_SEC = 600;   // この長さ以上の音声で並列検出する
+const SILENCE_PARALLEL_JOBS = Math.min(os.availableParallelism?.() ?? os.cpus().length, 8);
+const SILENCE_PARALLEL_OVERLAP_SEC = 5; // 区間の境目付近の無音を取りこぼさないための重なり
+
 // セグメント長の制約
 const MIN_SEGMENT_SEC = 60; // 1区間の最小長（これ未満なら切らない）
 const MIN_TAIL_SEC = 1;     // 最後にこの秒数以上残っていたら終端セグメントとして追加
 
 // OpenAI 関連
 const TRANSCRIBE_MODEL = "gpt-4o-transcribe";
+const TRANSCRIBE_CONCURRENCY = 4; // 同時に文字起こしするセグメント数
 
 // ffmpeg / ffprobe コマンド名（必要ならフルパスに変更）
 const FFMPEG_BIN = "ffmpeg";
@@ -61,26 +73,34 @@ function getDurationSec(inputPath) {
       "-show_entries",
       "format=duration",
       "-of",
-      "default=nk=1:nw=1",
+      "json",
       inputPath,
-    ]);
+    ], { stdio: ["ignore", "pipe", "pipe"] });
 
-    let out = "";
-    let err = "";
+    // チャンクごとの文字列化はせず、Buffer のまま溜めて必要なときだけ一度デコードする
+    const outChunks = [];
+    const errChunks = [];
 
     ff.stdout.on("data", (data) => {
-      out += data.toString();
+      outChunks.push(data);
     });
 
     ff.stderr.on("data", (data) => {
-      err += data.toString();
+      errChunks.push(data);
     });
 
     ff.on("close", (code) => {
       if (code !== 0) {
-        return reject(new Error(`ffprobe error: ${err}`));
+        return reject(new Error(`ffprobe error: ${Buffer.concat(errChunks).toString()}`));
+      }
+      const out = Buffer.concat(outChunks).toString();
+      // duration が取れない場合（N/A や欠落）は NaN になり下でエラーにする
+      let sec = NaN;
+      try {
+        sec = parseFloat(JSON.parse(out).format?.duration);
+      } catch {
+        // JSON として壊れている場合も NaN のまま
       }
-      const sec = parseFloat(out.trim());
       if (Number.isNaN(sec)) {
         return reject(new Error(`duration parse error: ${out}`));
       }
@@ -94,9 +114,20 @@ function getDurationSec(inputPath) {
 /* =========================
  * ffmpeg silencedetect で無音区間を検出
  * ========================= */
-function detectSilences(inputPath) {
+// offsetSec / lengthSec を指定するとその範囲だけを調べる（返す時刻はファイル先頭基準）
+function detectSilences(inputPath, offsetSec = 0, lengthSec = null) {
   return new Promise((resolve, reject) => {
+    const rangeArgs = [
+      ...(offsetSec > 0 ? ["-ss", String(offsetSec)] : []),
+      ...(lengthSec != null ? ["-t", String(lengthSec)] : []),
+    ];
+
+    // -nostats: 進捗行で stderr を膨らませない / -vn: 映像ストリームはデコードしない
     const ff = spawn(FFMPEG_BIN, [
+      "-hide_banner",
+      "-nostats",
+      "-vn",
+      ...rangeArgs,
       "-i",
       inputPath,
       "-af",
@@ -106,10 +137,10 @@ function detectSilences(inputPath) {
       "-",
     ]);
 
-    let stderr = "";
+    const stderrChunks = [];
 
     ff.stderr.on("data", (data) => {
-      stderr += data.toString();
+      stderrChunks.push(data);
     });
 
     ff.on("close", (code) => {
@@ -118,21 +149,18 @@ function detectSilences(inputPath) {
         console.warn("ffmpeg silencedetect exited with code", code);
       }
 
+      const stderr = Buffer.concat(stderrChunks).toString();
       const silences = [];
-      const lines = stderr.split("\n");
       let lastSilenceStart = null;
 
-      for (const line of lines) {
-        const mStart = line.match(/silence_start:\s*([0-9.]+)/);
-        if (mStart) {
-          lastSilenceStart = parseFloat(mStart[1]);
+      for (const [, kind, value, durValue] of stderr.matchAll(SILENCE_EVENT_RE)) {
+        if (kind === "start") {
+          lastSilenceStart = parseFloat(value) + offsetSec;
           continue;
         }
-        const mEnd = line.match(/silence_end:\s*([0-9.]+)/);
-        if (mEnd && lastSilenceStart != null) {
-          const end = parseFloat(mEnd[1]);
-          const durMatch = line.match(/silence_duration:\s*([0-9.]+)/);
-          const dur = durMatch ? parseFloat(durMatch[1]) : end - lastSilenceStart;
+        if (lastSilenceStart != null) {
+          const end = parseFloat(value) + offsetSec;
+          const dur = durValue ? parseFloat(durValue) : end - lastSilenceStart;
           silences.push({ start: lastSilenceStart, end, duration: dur });
           lastSilenceStart = null;
         }
@@ -145,14 +173,48 @@ function detectSilences(inputPath) {
   });
 }
 
+/* =========================
+ * 長い音声の無音検出を時間で分割して並列実行
+ * ========================= */
+// 各ジョブは担当区間の前後に SILENCE_PARALLEL_OVERLAP_SEC の重なりを持たせて調べ、
+// 無音の end が担当区間に入るものだけを採用する（区切りに使うのは end だけなので重複も欠けも出ない）。
+// 担当区間の手前から続いている無音は start が重なり部分の先頭に切り詰められることがある。
+async function detectSilencesParallel(inputPath, duration) {
+  const jobs = SILENCE_PARALLEL_JOBS;
+  const span = duration / jobs;
+
+  const ranges = Array.from({ length: jobs }, (_, i) => {
+    const ownStart = i * span;
+    const isLast = i === jobs - 1;
+    const ownEnd = isLast ? Infinity : (i + 1) * span;
+    const start = Math.max(0, ownStart - SILENCE_PARALLEL_OVERLAP_SEC);
+    const length = isLast ? null : ownEnd + SILENCE_PARALLEL_OVERLAP_SEC - start;
+    return { ownStart, ownEnd, start, length };
+  });
+
+  console.log(`無音検出を ${jobs} 並列で実行します（${duration.toFixed(1)} 秒）`);
+  const results = await Promise.all(
+    ranges.map((r) => detectSilences(inputPath, r.start, r.length)),
+  );
+
+  // 区間順に連結すれば end の昇順になる
+  return results.flatMap((silences, i) =>
+    silences.filter((s) => s.end >= ranges[i].ownStart && s.end < ranges[i].ownEnd),
+  );
+}
+
 /* =========================
  * 無音情報を使ってセグメントを決めて、実ファイルに分割
  * ========================= */
 // strategy:
 //   0 秒からスタートし、MIN_SEGMENT_SEC 以上経過した無音 end を区切りとする
 async function splitAudioBySilence(inputPath, outDir) {
+  // 総時間（ffprobe はヘッダーを読むだけなので速い）で、無音検出を並列にするか決める
   const duration = await getDurationSec(inputPath);
-  const silences = await detectSilences(inputPath);
+  const silences =
+    duration >= SILENCE_PARALLEL_MIN_SEC && SILENCE_PARALLEL_JOBS > 1
+      ? await detectSilencesParallel(inputPath, duration)
+      : await detectSilences(inputPath);
 
   if (!fs.existsSync(outDir)) {
     fs.mkdirSync(outDir, { recursive: true });
@@ -173,53 +235,70 @@ async function splitAudioBySilence(inputPath, outDir) {
     segments.push({ start: lastCut, end: duration });
   }
 
-  console.log("検出されたセグメント:");
-  console.log(segments);
+  console.log(`検出されたセグメント: ${segments.length} 個 (総時間 ${duration.toFixed(1)} 秒)`);
 
-  // 実際にファイルを切り出し
-  const segmentPaths = [];
-
-  for (let i = 0; i < segments.length; i++) {
-    const seg = segments[i];
-    const fileIndex = String(i + 1).padStart(3, "0");
-    const outFile = path.join(
-      outDir,
-      `${SEGMENT_FILE_PREFIX}${fileIndex}${SEGMENT_FILE_EXT}`,
-    );
+  if (segments.length === 0) {
+    return [];
+  }
 
-    await new Promise((resolve, reject) => {
-      const ff = spawn(FFMPEG_BIN, [
-        "-y",
-        "-i",
-        inputPath,
-        "-ss",
-        String(seg.start),
-        "-to",
-        String(seg.end),
-        "-c",
-        "copy", // 再エンコードなし。問題があれば "aac" などに変更
-        outFile,
-      ]);
-
-      ff.stderr.on("data", (d) => {
-        // デバッグしたいときは表示
-        // process.stderr.write(d);
-      });
-
-      ff.on("close", (code) => {
-        if (code !== 0) {
-          return reject(new Error(`ffmpeg segment failed: code ${code}`));
-        }
-        resolve();
-      });
+  // 実際にファイルを切り出し
+  // segment muxer で 1 回の ffmpeg 実行にまとめて切り出す（入力を読むのは 1 回だけ）
+  // 切れ目は各セグメントの end。短すぎて捨てた末尾は -t で出力しないようにする
+  const segmentTimes = segments.slice(0, -1).map((seg) => String(seg.end)).join(",");
+  const lastEnd = segments[segments.length - 1].end;
+  const outPattern = path.join(
+    outDir,
+    `${SEGMENT_FILE_PREFIX}%03d${SEGMENT_FILE_EXT}`,
+  );
+
+  const segmentArgs = segmentTimes ? ["-segment_times", segmentTimes] : [];
+
+  await new Promise((resolve, reject) => {
+    const ff = spawn(FFMPEG_BIN, [
+      "-hide_banner",
+      "-loglevel",
+      "error",
+      "-nostats",
+      "-y",
+      "-i",
+      inputPath,
+      "-map",
+      "0:a:0", // 入力が動画でも先頭の音声ストリームだけを切り出す
+      "-t",
+      String(lastEnd),
+      "-c",
+      "copy", // 再エンコードなし。問題があれば "aac" などに変更
+      "-f",
+      "segment",
+      ...segmentArgs,
+      "-segment_start_number",
+      "1",
+      "-reset_timestamps",
+      "1",
+      outPattern,
+    ], { stdio: ["ignore", "ignore", "pipe"] });
+
+    // -loglevel error なので stderr に出るのはエラーだけ。失敗時のメッセージに含める
+    const errChunks = [];
+    ff.stderr.on("data", (d) => {
+      errChunks.push(d);
+    });
 
-      ff.on("error", reject);
+    ff.on("close", (code) => {
+      if (code !== 0) {
+        const detail = Buffer.concat(errChunks).toString().trim();
+        return reject(new Error(`ffmpeg segment failed: code ${code}\n${detail}`));
+      }
+      resolve();
     });
 
-    segmentPaths.push(outFile);
-  }
+    ff.on("error", reject);
+  });
 
-  return segmentPaths;
+  return segments.map((_, i) => {
+    const fileIndex = String(i + 1).padStart(3, "0");
+    return path.join(outDir, `${SEGMENT_FILE_PREFIX}${fileIndex}${SEGMENT_FILE_EXT}`);
+  });
 }
 
 /* =========================
@@ -238,12 +317,13 @@ async function transcribeSegment(audioFilePath) {
 
 /* =========================
  * メイン処理
+ * argv: コマンドライン引数（pipeline_worker.js からは同じ形の配列が渡される）
  * ========================= */
-async function main() {
+export async function main(argv = process.argv.slice(2)) {
   try {
-    const inputAudioFile = process.argv[2] ?? DEFAULT_INPUT_AUDIO;
-    const outputTextFile = process.argv[3] ?? DEFAULT_OUTPUT_TEXT;
-    const workDirArg = process.argv[4] ?? null;   // ★ 追加: 作業用ディレクトリ
+    const inputAudioFile = argv[0] ?? DEFAULT_INPUT_AUDIO;
+    const outputTextFile = argv[1] ?? DEFAULT_OUTPUT_TEXT;
+    const workDirArg = argv[2] ?? null;   // ★ 追加: 作業用ディレクトリ
 
     if (!fs.existsSync(inputAudioFile)) {
       throw new Error(`音声ファイルが見つかりません: ${inputAudioFile}`);
@@ -272,25 +352,46 @@ async function main() {
       return;
     }
 
-    // 各セグメントを順番に文字起こし
-    let allText = "";
-
-    for (let i = 0; i < segmentPaths.length; i++) {
-      const segPath = segmentPaths[i];
-      const segText = await transcribeSegment(segPath);
-
-      allText += segText + "\n\n";
-
-      if (SAVE_PER_SEGMENT_TEXT) {
-        const fileIndex = String(i + 1).padStart(3, "0");
-        const segTxtPath = path.join(
-          segmentsDir,
-          `${SEGMENT_FILE_PREFIX}${fileIndex}.txt`,
-        );
-        fs.writeFileSync(segTxtPath, segText, "utf8");
+    // 各セグメントを並列に文字起こし（結果はインデックス順に保持）
+    const segTexts = new Array(segmentPaths.length).fill("");
+    const queue = segmentPaths.map((segPath, index) => ({ segPath, index }));
+
+    // どれか 1 つのセグメントが失敗したら、他のワーカーも新しいセグメントを取らずに止める
+    let failed = false;
+
+    const transcribeWorker = async () => {
+      while (queue.length > 0 && !failed) {
+        const { segPath, index } = queue.shift();
+        try {
+          const segText = await transcribeSegment(segPath);
+          segTexts[index] = segText;
+
+          if (SAVE_PER_SEGMENT_TEXT) {
+            const fileIndex = String(index + 1).padStart(3, "0");
+            const segTxtPath = path.join(
+              segmentsDir,
+              `${SEGMENT_FILE_PREFIX}${fileIndex}.txt`,
+            );
+            fs.writeFileSync(segTxtPath, segText, "utf8");
+          }
+        } catch (err) {
+          failed = true;
+          throw err;
+        }
       }
-    }
+    };
+
+    const concurrency = Math.min(TRANSCRIBE_CONCURRENCY, queue.length);
+    console.log(`並列文字起こし中 (最大 ${concurrency} 多重)...`);
+    // Promise.all だと最初の失敗で返ってしまい、残りのワーカーが pipeline_worker.js の中で
+    // 次の要求と並んで動き続けるので、全ワーカーが止まるのを待ってから失敗を伝える
+    const settled = await Promise.allSettled(
+      new Array(concurrency).fill(null).map(transcribeWorker),
+    );
+    const rejected = settled.find((r) => r.status === "rejected");
+    if (rejected) throw rejected.reason;
 
+    const allText = segTexts.join("\n\n");
     fs.writeFileSync(outputTextFile, allText.trim(), "utf8");
     console.log("------------------------------------------------");
     console.log("全セグメントの文字起こしが完了しました！");
@@ -299,7 +400,12 @@ async function main() {
     console.log("------------------------------------------------");
   } catch (err) {
     console.error("エラーが発生しました:", err);
+    // 呼び出し元（CLI の終了コード / pipeline_worker.js の応答）に失敗を伝える
+    throw err;
   }
 }
 
-main();
\ No newline at end of file
+// 直接実行されたときだけ起動する（pipeline_worker.js から import された場合は呼ばれるまで何もしない）
+if (import.meta.url === pathToFileURL(process.argv[1]).href) {
+  main().catch(() => process.exit(1));
+}
\ No newline at end of file
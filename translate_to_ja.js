@@ -6,6 +6,7 @@ import { RunnableSequence } from "@langchain/core/runnables";
 import { RecursiveCharacterTextSplitter } from "@langchain/textsplitters";
 import fs from "fs/promises";
 import path from "path";
+import { pathToFileURL } from "url";
 
 // ==========================================
 // 設定 (Configuration)
@@ -17,11 +18,18 @@ const CONFIG = {
   CHUNK_OVERLAP: 0,
   CONCURRENCY_LIMIT: 3, // 同時に処理するチャンク数
   MAX_RETRIES: 3,       // エラー時の最大リトライ回数
+  // リトライしても失敗したチャンクの扱い
+  //   true : 原文のまま出力に残して完了扱いにする（他のチャンクの API 呼び出しを無駄にしない）
+  //   false: 出力を書き出したうえで失敗扱いにする（原文混じりの結果を成功として残さない）
+  KEEP_SOURCE_ON_CHUNK_ERROR: true,
 };
 
 // ==========================================
 // プロンプト管理 (Prompts) - All English
 // ==========================================
+// 査読 (CRITIQUE) で指摘が無いときに出力させる文字列。完全一致したときだけ REFINE を省略する
+const CRITIQUE_NO_ISSUES = "No issues";
+
 const PROMPTS = {
   DRAFT: ChatPromptTemplate.fromMessages([
     ["system", `You are a professional technical translator.
@@ -45,7 +53,7 @@ Compare the "Original Text" and the "Translation Draft", and list improvement po
 2. **TTS Suitability**: Is the rhythm poor when heard via TTS, or are sentences too long causing unnatural pauses?
 3. **Accuracy & Naturalness**: Are there mistranslations? Has existing Japanese content been altered unnaturally?
 
-If there are no issues, output only "No issues".`],
+If there are no issues, output only "${CRITIQUE_NO_ISSUES}".`],
     ["user", "Original Text: {original_text}\n\nTranslation Draft: {initial_translation}"]
   ]),
 
@@ -82,6 +90,11 @@ class TranslationService {
       modelName: CONFIG.MODEL_NAME,
       temperature: CONFIG.TEMPERATURE
     });
+    // プロンプト → モデル → パーサーのチェーンは呼び出しごとに組み立てず、ここで一度だけ作る
+    const parser = new StringOutputParser();
+    this.draftChain = PROMPTS.DRAFT.pipe(this.model).pipe(parser);
+    this.critiqueChain = PROMPTS.CRITIQUE.pipe(this.model).pipe(parser);
+    this.refineChain = PROMPTS.REFINE.pipe(this.model).pipe(parser);
     this.chain = this._buildChain();
   }
 
@@ -89,18 +102,12 @@ class TranslationService {
     return RunnableSequence.from([
       // Step 1: Draft
       async (input) => {
-        const initialTranslation = await PROMPTS.DRAFT
-          .pipe(this.model)
-          .pipe(new StringOutputParser())
-          .invoke(input);
+        const initialTranslation = await this.draftChain.invoke(input);
         return { ...input, initial_translation: initialTranslation };
       },
       // Step 2: Critique
       async (input) => {
-        const critique = await PROMPTS.CRITIQUE
-          .pipe(this.model)
-          .pipe(new StringOutputParser())
-          .invoke(input);
+        const critique = await this.critiqueChain.invoke(input);
         return { ...input, critique };
       },
       // Step 3: Refine
@@ -108,23 +115,16 @@ class TranslationService {
         const prefix = input.chunk_id ? `[Chunk ${input.chunk_id}]` : "";
         let finalTranslation;
 
-        const critiqueSnippet = input.critique.replace(/\n/g, " ").slice(0, 40);
+        // 先に切り出してから改行を置換する（長い査読文全体を走査しない）
+        const critiqueSnippet = input.critique.slice(0, 40).replace(/[\r\n]/g, " ");
         
-        if (input.critique.includes("No issues") || input.critique.includes("問題なし")) {
+        if (input.critique.trim() === CRITIQUE_NO_ISSUES) {
           console.log(`  ${prefix} 査読: 問題なし (${critiqueSnippet}...)`);
-          finalTranslation = await PROMPTS.REFINE
-            .pipe(this.model)
-            .pipe(new StringOutputParser())
-            .invoke({
-              ...input,
-              critique: "No changes needed."
-            });
+          // REFINE プロンプトは「指摘がなければ初稿をそのまま出力」なので、API を呼ばずに初稿を採用する
+          finalTranslation = input.initial_translation;
         } else {
           console.log(`  ${prefix} 査読: 指摘あり (${critiqueSnippet}...)`);
-          finalTranslation = await PROMPTS.REFINE
-            .pipe(this.model)
-            .pipe(new StringOutputParser())
-            .invoke(input);
+          finalTranslation = await this.refineChain.invoke(input);
         }
 
         return {
@@ -195,7 +195,7 @@ class App {
       if (!text.trim()) throw new Error("File is empty");
     } catch (e) {
       console.error("❌ ファイル読み込みエラー:", e.message);
-      return;
+      throw e;
     }
 
     // 2. 分割
@@ -207,64 +207,69 @@ class App {
     const docs = await splitter.createDocuments([text]);
     console.log(`Total Chunks: ${docs.length}`);
 
-    // 3. バッチ処理
-    const results = [];
-    for (let i = 0; i < docs.length; i++) results.push(null);
-
-    for (let i = 0; i < docs.length; i += CONFIG.CONCURRENCY_LIMIT) {
-      const batch = docs.slice(i, i + CONFIG.CONCURRENCY_LIMIT);
-      
-      await Promise.all(
-        batch.map((doc, idx) => {
-          const globalIndex = i + idx;
-          return this.translator
-            .translateChunk(doc.pageContent, globalIndex, docs.length)
-            .then(async (res) => {
-              results[globalIndex] = res;
-
-              const chunkId = String(globalIndex + 1).padStart(3, "0");
-
-              // デバッグ用: 各ステップを個別ファイルに保存（debugDir配下）
-              await fs.writeFile(
-                path.join(this.outputPaths.debugDir, `chunk_${chunkId}_original.txt`),
-                doc.pageContent,
-                "utf-8"
-              );
-              await fs.writeFile(
-                path.join(this.outputPaths.debugDir, `chunk_${chunkId}_draft.txt`),
-                res.draft,
-                "utf-8"
-              );
-              await fs.writeFile(
-                path.join(this.outputPaths.debugDir, `chunk_${chunkId}_critique.txt`),
-                res.critique,
-                "utf-8"
-              );
-              await fs.writeFile(
-                path.join(this.outputPaths.debugDir, `chunk_${chunkId}_refine.txt`),
-                res.refine,
-                "utf-8"
-              );
-            })
-            .catch((err) => {
-              console.error(`❌ Chunk ${globalIndex + 1} Error:`, err.message);
-              const errorMsg = `[Error]\n${doc.pageContent}`;
-              results[globalIndex] = {
-                draft: errorMsg,
-                critique: "Error",
-                refine: errorMsg,
-              };
-            });
-        })
-      );
-    }
+    // 3. 並列処理（CONCURRENCY_LIMIT 本のワーカーがキューから順に取り出す）
+    //    バッチ単位で待ち合わせないので、遅いチャンクがあっても他のワーカーは止まらない
+    const results = new Array(docs.length).fill(null);
+    const queue = docs.map((doc, index) => ({ doc, index }));
+
+    const processChunk = async ({ doc, index: globalIndex }) => {
+      try {
+        const res = await this.translator.translateChunk(doc.pageContent, globalIndex, docs.length);
+        results[globalIndex] = res;
+
+        const chunkId = String(globalIndex + 1).padStart(3, "0");
+
+        // デバッグ用: 各ステップを個別ファイルに保存（debugDir配下、4 ファイルは同時に書き出す）
+        const debugFiles = {
+          original: doc.pageContent,
+          draft: res.draft,
+          critique: res.critique,
+          refine: res.refine,
+        };
+        await Promise.all(
+          Object.entries(debugFiles).map(([step, content]) =>
+            fs.writeFile(
+              path.join(this.outputPaths.debugDir, `chunk_${chunkId}_${step}.txt`),
+              content,
+              "utf-8"
+            )
+          )
+        );
+      } catch (err) {
+        console.error(`❌ Chunk ${globalIndex + 1} Error:`, err.message);
+        const errorMsg = `[Error]\n${doc.pageContent}`;
+        results[globalIndex] = {
+          draft: errorMsg,
+          critique: "Error",
+          refine: errorMsg,
+        };
+      }
+    };
+
+    const worker = async () => {
+      while (queue.length > 0) {
+        await processChunk(queue.shift());
+      }
+    };
+
+    const concurrency = Math.min(CONFIG.CONCURRENCY_LIMIT, queue.length);
+    await Promise.all(new Array(concurrency).fill(null).map(worker));
 
     // 4. 結果の結合と保存
     const fullDraft = results.map((r) => r.draft).join("\n\n");
-    await fs.writeFile(this.outputPaths.draft, fullDraft, "utf-8");
-
     const fullFinal = results.map((r) => r.refine).join("\n\n");
-    await fs.writeFile(this.outputPaths.final, fullFinal, "utf-8");
+    await Promise.all([
+      fs.writeFile(this.outputPaths.draft, fullDraft, "utf-8"),
+      fs.writeFile(this.outputPaths.final, fullFinal, "utf-8"),
+    ]);
+
+    // 失敗したチャンクは原文のまま出力に残っている（[Error] 付き）
+    const failedCount = results.filter((r) => r.critique === "Error").length;
+    if (failedCount > 0) {
+      const message = `${failedCount} / ${docs.length} チャンクの翻訳に失敗しました`;
+      if (!CONFIG.KEEP_SOURCE_ON_CHUNK_ERROR) throw new Error(message);
+      console.warn(`⚠️ ${message}（原文のまま出力しています）`);
+    }
 
     console.log(`\n=== 完了 ===`);
     console.log(`  - 最終結果: ${this.outputPaths.final}`);
@@ -276,13 +281,23 @@ class App {
 // ==========================================
 // エントリーポイント
 // ==========================================
+// argv: コマンドライン引数（pipeline_worker.js からは同じ形の配列が渡される）
+export async function main(argv = process.argv.slice(2)) {
+  // 第1引数: 入力テキスト
+  const inputFile = argv[0] || "input_en.txt";
+  // 第2引数: 最終出力ファイル
+  const finalOutputFile = argv[1] || "output_ja.txt";
+  // 第3引数: debug / 一時ファイル用ディレクトリ
+  const debugDir = argv[2] || "outputs/work_translate";
+
+  const app = new App(inputFile, finalOutputFile, debugDir);
+  await app.run();
+}
 
-// 第1引数: 入力テキスト
-const inputFile = process.argv[2] || "input_en.txt";
-// 第2引数: 最終出力ファイル
-const finalOutputFile = process.argv[3] || "output_ja.txt";
-// 第3引数: debug / 一時ファイル用ディレクトリ
-const debugDir = process.argv[4] || "outputs/work_translate";
-
-const app = new App(inputFile, finalOutputFile, debugDir);
-app.run();
+// 直接実行されたときだけ起動する（pipeline_worker.js から import された場合は呼ばれるまで何もしない）
+if (import.meta.url === pathToFileURL(process.argv[1]).href) {
+  main().catch((e) => {
+    console.error("エラーが発生しました:", e.message);
+    process.exit(1);
+  });
+}
@@ -1,6 +1,16 @@
 import argparse
+from collections.abc import Callable
+import contextlib
+import functools
+import hashlib
+import json
+import os
 import subprocess
 import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import shutil
 import shlex
@@ -9,8 +19,17 @@ import shlex
 # =========================
 # 定数
 # =========================
+BASE_DIR = Path(__file__).parent
 OUTPUTS_DIR_NAME = "outputs"
 
+# 各ステージのスクリプト（このファイルと同じディレクトリにある）
+DL_SCRIPT_PATH = BASE_DIR / "dl_youtube.py"
+TRANSCRIBE_JS_PATH = BASE_DIR / "transcribe.js"
+TRANSLATE_JS_PATH = BASE_DIR / "translate_to_ja.js"
+TTS_JS_PATH = BASE_DIR / "text_to_speech.js"
+PIPELINE_WORKER_JS_PATH = BASE_DIR / "pipeline_worker.js"
+MAKE_FINAL_VIDEO_PATH = BASE_DIR / "make_final_video.py"
+
 SOURCE_VIDEO_FILENAME = "source_video.mp4"
 SOURCE_AUDIO_FILENAME = "source_audio.m4a"
 SOURCE_THUMB_FILENAME = "source_thumb.jpg"
@@ -21,13 +40,37 @@ TRANSCRIBE_WORKDIR_NAME = "_work_transcribe"
 TRANSLATED_JA_FILENAME = "translated_ja.txt"
 TRANSLATE_WORKDIR_NAME = "_work_translate_to_ja"
 
+# 最終動画の映像部分（背景 + 埋め込み動画 1 周分）。TTS と並行して先にエンコードしておく
+EMBED_CLIP_FILENAME = "embed_clip.mp4"
+
+# バックグラウンドで並行して動かす処理の数（動画ダウンロード・サムネ生成・埋め込みクリップ生成）
+BACKGROUND_WORKERS = 3
+
 # make_final_video.py 側のデフォルト名と揃えておく（内部用に保持）
 VIDEO_THUMB_FINAL_NAME = "video_thumb_final.png"
 
 # ここから追加: サムネ & 最終動画生成用
-FINAL_AUDIO_JA_FILENAME = "audio_ja.mp3"  # text_to_speech.js の出力 (outputs/[name]/audio_ja.mp3 を想定)
+# AAC (m4a) で出力させると、最終動画の mux で音声を再エンコードせずにコピーできる
+FINAL_AUDIO_JA_FILENAME = "audio_ja.m4a"  # text_to_speech.js の出力 (outputs/[name]/audio_ja.m4a を想定)
 BACKGROUND_IMAGE_PATH = Path("assets/chobi_screen_yt_fukikae_x2.png")
 
+# ステージ単位のキャッシュ（outputs/_cache/<stage>/<key>/）
+# key は「ステージ名・パラメータ・入力ファイル（スクリプト自身を含む）の sha256」から作る
+CACHE_DIR_NAME = "_cache"
+CACHE_MAX_BYTES = 20 * 1024 ** 3  # キャッシュ全体の上限。実行の最後に超えていたら古いエントリから削除する
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# node は起動時に絶対パスへ解決しておく（sys.executable はもともと絶対パス）。
+# subprocess は実行ファイルがパス付きで close_fds=False のときだけ fork+exec ではなく posix_spawn を使える
+# （Python が開く fd は PEP 446 で既定が継承不可なので、close_fds=False でも子プロセスには漏れない）
+NODE_BIN = shutil.which("node") or "node"
+
+# 失敗・中断時に子プロセスを terminate してから kill するまでの猶予（秒）
+CHILD_TERMINATE_TIMEOUT = 5
+
+# ステージごとの処理時間の記録（stage_timer が追加し、最後に [STATS] として出力する）
+STAGE_TIMES: list[dict] = []
+
 # デフォルトのヘッダーとタイトル（引数で指定がなかった場合に使用）
 DEFAULT_HEADER_TEXT = ""
 DEFAULT_TITLE_TEXT = ""
@@ -81,6 +124,12 @@ def parse_args() -> argparse.ArgumentParser:
         ),
     )
 
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"ステージ単位のキャッシュ（{OUTPUTS_DIR_NAME}/{CACHE_DIR_NAME}）を使わずに全ステージを実行する",
+    )
+
     # ★サムネだけ作りたいときのフラグ
     parser.add_argument(
         "--image-only",
@@ -94,32 +143,421 @@ def parse_args() -> argparse.ArgumentParser:
 def print_command(label: str, cmd: list[str]) -> None:
     """
     実行コマンドを見やすく表示するヘルパー。
+    ダウンロードやサムネ生成を別スレッドでも実行するので、他の出力と行単位で混ざらないよう 1 回の print で書き出す。
     """
-    print("\n" + "-" * 60)
-    print(f"[STEP] {label}")
-
+    lines = ["", "-" * 60, f"[STEP] {label}"]
     if cmd:
-        print(f"  Exec   : {cmd[0]}")
+        lines.append(f"  Exec   : {cmd[0]}")
     if len(cmd) > 1:
-        print(f"  Script : {cmd[1]}")
-    full = " ".join(shlex.quote(str(c)) for c in cmd)
-    print("  Command:")
-    print(f"    {full}")
-    print("-" * 60)
+        lines.append(f"  Script : {cmd[1]}")
+    lines.append("  Command:")
+    lines.append(f"    {shlex.join(str(c) for c in cmd)}")
+    lines.append("-" * 60)
+    print("\n".join(lines))
+
+
+# キャッシュエントリの参照・保存・削除を排他する（バックグラウンドのステージと並行して run_cached が呼ばれるため）
+_CACHE_LOCK = threading.Lock()
+
+
+@functools.lru_cache(maxsize=None)
+def _file_sha256_cached(path: str, size: int, mtime_ns: int) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def file_sha256(path: Path) -> str | None:
+    """
+    ファイル内容の sha256 を返す（存在しなければ None）。
+    同じファイル（サイズ・mtime が同じ）はプロセス内で 1 回だけ読む。
+    """
+    if not path.exists():
+        return None
+    st = path.stat()
+    return _file_sha256_cached(str(path.resolve()), st.st_size, st.st_mtime_ns)
+
+
+def _link_or_copy(src: Path, dst: Path, link: bool = True) -> None:
+    """
+    src を dst にハードリンクする（別ファイルシステムなどで失敗したらコピー）。
+    link=False なら最初からコピーする（キャッシュと inode を共有させたくないファイル用）。
+    """
+    dst.unlink(missing_ok=True)
+    if link:
+        try:
+            os.link(src, dst)
+            return
+        except OSError:
+            pass
+    shutil.copy2(src, dst)
+
+
+def _remove_trash_dirs(parent: Path, name: str) -> None:
+    """
+    parent 配下に退避した旧ジョブディレクトリ（.<name>.trash.*）をすべて削除する。
+    """
+    prefix = f".{name}.trash."
+    for entry in parent.iterdir():
+        if entry.is_dir() and entry.name.startswith(prefix):
+            shutil.rmtree(entry, ignore_errors=True)
+
+
+def _evict_cache(cache_root: Path) -> None:
+    """
+    キャッシュ全体が CACHE_MAX_BYTES を超えていたら、最終利用（mtime）が古いエントリから削除する。
+    走査中に別プロセスが消したエントリ・ファイルは、もう無いものとして飛ばす。
+    """
+    if not cache_root.is_dir():
+        return
+
+    entries = []
+    with _CACHE_LOCK:
+        for stage_dir in cache_root.iterdir():
+            if not stage_dir.is_dir():
+                continue
+            for entry in stage_dir.iterdir():
+                if not entry.is_dir() or entry.name.startswith("."):
+                    continue
+                try:
+                    size = sum(f.stat().st_size for f in entry.iterdir() if f.is_file())
+                    entries.append((entry.stat().st_mtime, size, entry))
+                except FileNotFoundError:
+                    continue
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total <= CACHE_MAX_BYTES:
+                break
+            print(f"[CACHE] evict : {entry}")
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+
+@contextlib.contextmanager
+def stage_timer(label: str, stage: str):
+    """
+    with ブロック内の処理時間（経過時間・CPU 時間）を [TIME] で表示し、STAGE_TIMES に記録する。
+    CPU 時間はこのプロセス（スレッド含む）と終了済みの子プロセスの合計なので、
+    バックグラウンドの処理と重なっている間はその分も含まれる。
+    yield する dict に "cache" などを書き込むと記録に残る。
+    """
+    record = {"stage": stage, "label": label, "cache": None, "returncode": 0}
+    t0 = time.perf_counter_ns()
+    cpu0 = os.times()
+    try:
+        yield record
+    except subprocess.CalledProcessError as e:
+        record["returncode"] = e.returncode
+        raise
+    finally:
+        cpu1 = os.times()
+        record["wall_ns"] = time.perf_counter_ns() - t0
+        record["user_s"] = round(
+            (cpu1.user + cpu1.children_user) - (cpu0.user + cpu0.children_user), 3
+        )
+        record["sys_s"] = round(
+            (cpu1.system + cpu1.children_system) - (cpu0.system + cpu0.children_system), 3
+        )
+        STAGE_TIMES.append(record)
+
+        cache_note = f" cache={record['cache']}" if record["cache"] else ""
+        print(
+            f"[TIME] {label}: wall={record['wall_ns'] / 1e9:.2f}s "
+            f"user={record['user_s']:.2f}s sys={record['sys_s']:.2f}s{cache_note}"
+        )
+
+
+def print_stage_stats(total_wall_ns: int) -> None:
+    """
+    記録したステージごとの時間を 1 行の JSON（[STATS]）で出力する（集計・比較用）。
+    """
+    stats = {"total_wall_ns": total_wall_ns, "stages": STAGE_TIMES}
+    print("[STATS] " + json.dumps(stats, ensure_ascii=False))
+
+
+def run_cached(
+    label: str,
+    cmd: list[str],
+    cache_root: Path | None,
+    stage: str,
+    inputs: list[Path],
+    outputs: list[Path],
+    params: tuple = (),
+    runner: Callable[[list[str]], object] | None = None,
+    link_outputs: bool = True,
+) -> None:
+    """
+    outputs を生成するコマンドを、入力が同じなら前回の結果を使って省略する。
+    キャッシュにあれば outputs にハードリンクして終わり。無ければ実行して結果をキャッシュへ入れる。
+    cache_root が None ならキャッシュを使わずにそのまま実行する。
+    runner を渡すと subprocess の代わりにそれで cmd を実行する（NodeWorker.run など）。
+    link_outputs=False ならハードリンクせずにコピーする（--output-dir に置く最終成果物用。
+    ユーザーが手元で編集してもキャッシュ側が書き換わらないように）。
+    失敗時は subprocess.CalledProcessError を送出する。
+    """
+    with stage_timer(label, stage) as record:
+        record["cache"] = _run_cached(
+            label, cmd, cache_root, stage, inputs, outputs, params, runner, link_outputs
+        )
+
+
+def _run_cached(
+    label: str,
+    cmd: list[str],
+    cache_root: Path | None,
+    stage: str,
+    inputs: list[Path],
+    outputs: list[Path],
+    params: tuple,
+    runner: Callable[[list[str]], object] | None,
+    link_outputs: bool,
+) -> str:
+    """
+    run_cached の本体。キャッシュの状態（"off" / "hit" / "miss"）を返す。
+    """
+    run = runner or _run_subprocess
+
+    if cache_root is None:
+        print_command(label, cmd)
+        run(cmd)
+        return "off"
+
+    key_src = json.dumps(
+        {
+            "stage": stage,
+            "params": list(params),
+            "inputs": [file_sha256(p) for p in inputs],
+        },
+        sort_keys=True,
+    )
+    key = hashlib.sha256(key_src.encode("utf-8")).hexdigest()
+    entry = cache_root / stage / key
+    # 出力はファイル名ではなく順番で保存する（--name が変わっても同じエントリを使えるように）
+    cached_files = [entry / f"{i}{o.suffix}" for i, o in enumerate(outputs)]
+
+    with _CACHE_LOCK:
+        if all(f.exists() for f in cached_files):
+            print(f"[CACHE] hit   : {label} ({entry})")
+            for cached, out in zip(cached_files, outputs):
+                _link_or_copy(cached, out, link=link_outputs)
+            os.utime(entry)  # 最終利用時刻を更新（_evict_cache 用）
+            return "hit"
+
+    # 出力先は先に消しておく（前回キャッシュからハードリンクした inode を上書きしないため）
+    for out in outputs:
+        out.unlink(missing_ok=True)
+
+    print_command(label, cmd)
+    run(cmd)
+
+    missing = [out for out in outputs if not out.exists()]
+    if missing:
+        print(f"[WARN] 出力が揃っていないためキャッシュしません: {', '.join(map(str, missing))}")
+        return "miss"
+
+    # 一時ディレクトリに揃えてから rename して、途中状態のエントリが見えないようにする
+    with _CACHE_LOCK:
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        tmp_entry = Path(tempfile.mkdtemp(prefix=f".{key}.", dir=entry.parent))
+        for cached, out in zip(cached_files, outputs):
+            _link_or_copy(out, tmp_entry / cached.name, link=link_outputs)
+        shutil.rmtree(entry, ignore_errors=True)
+        tmp_entry.rename(entry)
+    print(f"[CACHE] store : {label} ({entry})")
+    return "miss"
+
+
+def _preflight(args: argparse.Namespace) -> None:
+    """
+    ダウンロードや API 呼び出しを始める前に、必要なファイル・コマンドが揃っているかを確認する。
+    足りないものがあればまとめて [FATAL] を表示して終了する（途中のステージで落ちて時間と API 料金を無駄にしないため）。
+    """
+    problems = []
+
+    required_files = [BACKGROUND_IMAGE_PATH, MAKE_FINAL_VIDEO_PATH]
+    if not args.image_only:
+        required_files += [
+            DL_SCRIPT_PATH,
+            PIPELINE_WORKER_JS_PATH,
+            TRANSCRIBE_JS_PATH,
+            TRANSLATE_JS_PATH,
+            TTS_JS_PATH,
+        ]
+    for path in required_files:
+        if not path.exists():
+            problems.append(f"ファイルが見つかりません: {path}")
+
+    if not args.image_only:
+        if shutil.which(NODE_BIN) is None:
+            problems.append("node が見つかりません（Node.js をインストールして PATH を通してください）")
+        if not (BASE_DIR / "node_modules").is_dir():
+            problems.append(f"node_modules がありません（{BASE_DIR} で npm install を実行してください）")
+        for command in ("ffmpeg", "ffprobe"):
+            if shutil.which(command) is None:
+                problems.append(f"{command} が見つかりません（PATH を確認してください）")
+
+    if problems:
+        for problem in problems:
+            print(f"[FATAL] {problem}")
+        sys.exit(1)
+
+
+# 実行中の子プロセス（失敗・中断時に _abort_background でまとめて止める）
+_CHILD_PROCS: set[subprocess.Popen] = set()
+_CHILD_PROCS_LOCK = threading.Lock()
+_CANCELLED = threading.Event()
+
+
+def _stop_process(proc: subprocess.Popen) -> None:
+    """
+    子プロセスを terminate し、猶予内に終わらなければ kill する。
+    """
+    proc.terminate()
+    try:
+        proc.wait(timeout=CHILD_TERMINATE_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+def _run_subprocess(cmd: list[str]) -> None:
+    """
+    cmd を子プロセスとして実行して終了を待つ（run_cached の既定の runner）。
+    _abort_background で止められるよう、実行中は _CHILD_PROCS に登録しておく。
+    失敗時は subprocess.CalledProcessError を送出する。
+    """
+    with _CHILD_PROCS_LOCK:
+        if _CANCELLED.is_set():
+            raise subprocess.CalledProcessError(1, cmd)
+        proc = subprocess.Popen(cmd, close_fds=False)
+        _CHILD_PROCS.add(proc)
+    try:
+        returncode = proc.wait()
+    finally:
+        with _CHILD_PROCS_LOCK:
+            _CHILD_PROCS.discard(proc)
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, cmd)
+
+
+def run_make_final_video(cmd: list[str]) -> None:
+    """
+    [sys.executable, "make_final_video.py", *argv] と同じ処理を、インタプリタを起動し直さずにこのプロセスで実行する。
+    （run_cached の runner 用。PIL などの import も 1 回で済む）
+    失敗時は subprocess.CalledProcessError を送出する。
+    """
+    import make_final_video
+
+    returncode = make_final_video.run([str(c) for c in cmd[2:]])
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, cmd)
+
+
+class NodeWorker:
+    """
+    pipeline_worker.js を 1 回だけ起動し、JS のステージ（文字起こし・翻訳・TTS）を同じ Node プロセスで実行する。
+    ステージごとに node の起動とモジュール読み込みをやり直さずに済む。
+    要求/応答は 1 行 1 JSON（stdin / stdout）。スクリプトのログは stderr にそのまま流れる。
+    """
+
+    def __init__(self, script_path: Path) -> None:
+        self.proc = subprocess.Popen(
+            [NODE_BIN, str(script_path)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            bufsize=1,
+            close_fds=False,
+        )
+
+    def run(self, cmd: list[str]) -> None:
+        """
+        ["node", "<script>.js", *argv] と同じ処理をワーカー上で実行する（run_cached の runner 用）。
+        失敗時は subprocess.CalledProcessError を送出する。
+        """
+        request = {"op": Path(cmd[1]).stem, "argv": [str(c) for c in cmd[2:]]}
+        try:
+            self.proc.stdin.write(json.dumps(request, ensure_ascii=False) + "\n")
+            self.proc.stdin.flush()
+            line = self.proc.stdout.readline()
+        except OSError:
+            line = ""
+
+        if not line:
+            # ワーカー自体が落ちている
+            raise subprocess.CalledProcessError(self.proc.wait() or 1, cmd)
+
+        try:
+            response = json.loads(line)
+        except json.JSONDecodeError:
+            # stdout に応答以外の出力が混ざった（プロトコルが崩れている）
+            print(f"[ERR] pipeline_worker: 不正な応答です: {line.rstrip()!r}")
+            raise subprocess.CalledProcessError(1, cmd, output=line)
+        if not response.get("ok"):
+            print(f"[ERR] pipeline_worker: {response.get('error')}")
+            raise subprocess.CalledProcessError(1, cmd)
+
+    def close(self) -> None:
+        """
+        stdin を閉じてワーカーを終了させる。
+        """
+        if self.proc.stdin and not self.proc.stdin.closed:
+            self.proc.stdin.close()
+        self.proc.wait()
+
+    def terminate(self) -> None:
+        """
+        処理中の要求があっても終わるのを待たずにワーカーを止める（失敗・中断時用）。
+        """
+        if self.proc.stdin and not self.proc.stdin.closed:
+            try:
+                self.proc.stdin.close()
+            except OSError:
+                pass
+        _stop_process(self.proc)
+
+
+def _abort_background(background_pool: ThreadPoolExecutor, node_worker: NodeWorker) -> None:
+    """
+    失敗・中断時に、バックグラウンドの処理を終わるまで待たずに止める。
+    未開始のジョブは取り消し、実行中の子プロセス（dl_youtube.py・ffmpeg・Node ワーカー）は終了させる。
+    （ThreadPoolExecutor のスレッドは終了時に join されるので、止めないと全部終わるまで終了できない）
+    """
+    import make_final_video
+
+    background_pool.shutdown(wait=False, cancel_futures=True)
+    with _CHILD_PROCS_LOCK:
+        _CANCELLED.set()
+        procs = list(_CHILD_PROCS)
+    for proc in procs:
+        _stop_process(proc)
+    make_final_video.cancel_running_commands()
+    node_worker.terminate()
 
 
 def main() -> None:
     parser = parse_args()
     args = parser.parse_args()
+    started_ns = time.perf_counter_ns()
+    _preflight(args)
 
-    base_dir = Path(__file__).parent
-    outputs_dir = base_dir / OUTPUTS_DIR_NAME
+    outputs_dir = BASE_DIR / OUTPUTS_DIR_NAME
     job_dir = outputs_dir / args.name  # outputs/[--name]
 
     # 既存の outputs/[name] を削除してから作成
+    # 中身（セグメントや TTS の断片など）が多いと rmtree は時間がかかるので、
+    # 名前を変えて退避だけしておき、実際の削除はバックグラウンドで行う
     if job_dir.exists():
         print(f"[INFO] Remove existing job dir : {job_dir}")
-        shutil.rmtree(job_dir)
+        trash_dir = job_dir.with_name(f".{job_dir.name}.trash.{os.getpid()}.{time.time_ns()}")
+        job_dir.rename(trash_dir)
+        # 以前の実行で消しきれずに残った退避ディレクトリもまとめて消す
+        # （daemon にしないので、処理が先に終わっても削除が済むまでは終了を待つ）
+        threading.Thread(target=_remove_trash_dirs, args=(outputs_dir, job_dir.name)).start()
 
     outputs_dir.mkdir(parents=True, exist_ok=True)
     job_dir.mkdir(parents=True, exist_ok=True)
@@ -127,6 +565,10 @@ def main() -> None:
     print(f"[INFO] Output base dir : {outputs_dir}")
     print(f"[INFO] Job output dir  : {job_dir}")
 
+    cache_root = None if args.no_cache else outputs_dir / CACHE_DIR_NAME
+    if cache_root is not None:
+        print(f"[INFO] Cache dir       : {cache_root}")
+
     # 各出力ファイルパス（中間成果物）
     video_path = job_dir / SOURCE_VIDEO_FILENAME
     audio_path = job_dir / SOURCE_AUDIO_FILENAME
@@ -135,11 +577,13 @@ def main() -> None:
     transcribe_path = job_dir / TRANSCRIBE_FILENAME
     transcribe_workdir = job_dir / TRANSCRIBE_WORKDIR_NAME  # outputs/[name]/_work_transcribe/
 
+    embed_clip_path = job_dir / EMBED_CLIP_FILENAME
+
     translated_ja_path = job_dir / TRANSLATED_JA_FILENAME
     translate_workdir = job_dir / TRANSLATE_WORKDIR_NAME    # outputs/[name]/_work_translate_to_ja/
 
     # TTS 出力パスはどちらのモードでも先に決めておく
-    audio_ja_path = job_dir / FINAL_AUDIO_JA_FILENAME  # outputs/[name]/audio_ja.mp3
+    audio_ja_path = job_dir / FINAL_AUDIO_JA_FILENAME  # outputs/[name]/audio_ja.m4a
 
     # 最終出力ディレクトリ（サムネ・動画）
     if args.output_dir:
@@ -156,121 +600,119 @@ def main() -> None:
     print(f"[INFO] Final video path : {final_video_path}")
     print(f"[INFO] Final thumb path : {final_thumb_path}")
 
+    # make_final_video.py で使う共通情報
+    youtube_short_url = f"https://youtu.be/{args.youtube_id}"
+
+    # サムネ PNG の生成（両モード共通）
+    # 音声ファイルは存在しなくてよいので、ダミーとして source_video パスを渡す
+    cmd_make_thumb = [
+        sys.executable,
+        str(MAKE_FINAL_VIDEO_PATH),
+        str(BACKGROUND_IMAGE_PATH),
+        str(video_path),          # --image-only なのでチェックされない
+        "--header", args.header,  # 引数を使用
+        "--title", args.title,    # 引数を使用
+        "--url", youtube_short_url,
+        "--embed-thumb", str(thumb_path),
+        "--output-thumb", str(final_thumb_path),
+        "--image-only",
+    ]
+
     # 1) dl_youtube.py で YouTube から取得
-    dl_script_path = base_dir / "dl_youtube.py"
 
     if args.image_only:
         # ★サムネだけ取得
-        cmd_dl = [
-            sys.executable,
-            str(dl_script_path),
-            "--video-id", args.youtube_id,
-            "--output-thumb", str(thumb_path),
-        ]
+        # JPEG 1 枚のためにインタプリタを起動し直すのは無駄なので、dl_youtube の関数をこのプロセスで直接呼ぶ
         print("[INFO] --image-only: YouTube からはサムネイルのみ取得します（動画/音声はダウンロードしません）")
-    else:
-        # 通常モード: 動画 + サムネ（音声は動画から分離する）
-        cmd_dl = [
-            sys.executable,
-            str(dl_script_path),
-            "--video-id", args.youtube_id,
-            "--output-video", str(video_path),
-            "--output-thumb", str(thumb_path),
-        ]
+        from dl_youtube import download_thumbnail
 
-    print_command("download (dl_youtube.py)", cmd_dl)
-    result = subprocess.run(cmd_dl)
-    print(f"[INFO] dl_youtube.py returncode = {result.returncode}")
-    if result.returncode != 0:
-        print("[FATAL] dl_youtube.py failed")
-        sys.exit(result.returncode)
+        with stage_timer("download thumb (dl_youtube)", "download_thumb"):
+            saved_thumb = download_thumbnail(args.youtube_id, thumb_path.resolve())
+        if saved_thumb is None:
+            print("[WARN] サムネイルを取得できませんでした（サムネ合成なしで続行します）")
 
-    # 通常モードの場合: ffmpegで動画から音声を分離
-    if not args.image_only:
-        cmd_extract_audio = [
-            "ffmpeg",
-            "-y",
-            "-i", str(video_path),
-            "-vn",
-            "-acodec", "copy",
-            str(audio_path),
-        ]
-        print_command("extract audio (ffmpeg)", cmd_extract_audio)
-        result = subprocess.run(cmd_extract_audio)
-        if result.returncode != 0:
-            print("[FATAL] ffmpeg audio extraction failed")
-            sys.exit(result.returncode)
-
-    # make_final_video.py で使う共通情報
-    make_final_video_path = base_dir / "make_final_video.py"
-    youtube_short_url = f"https://youtu.be/{args.youtube_id}"
-
-    if args.image_only:
-        # 音声ファイルは存在しなくてよいので、ダミーとして source_audio パスを渡す
-        cmd_make_video = [
-            sys.executable,
-            str(make_final_video_path),
-            str(BACKGROUND_IMAGE_PATH),
-            str(audio_path),          # 存在しないが --image-only なのでチェックされない
-            "--header", args.header,  # 引数を使用
-            "--title", args.title,    # 引数を使用
-            "--url", youtube_short_url,
-            "--embed-thumb", str(thumb_path),
-            "--output-thumb", str(final_thumb_path),
-            "--image-only",
-        ]
-
-        print_command("make_final_video (image-only)", cmd_make_video)
-        subprocess.run(cmd_make_video, check=True)
+        print_command("make_final_video (image-only)", cmd_make_thumb)
+        try:
+            with stage_timer("make_final_video (image-only)", "thumb"):
+                run_make_final_video(cmd_make_thumb)
+        except subprocess.CalledProcessError as e:
+            print(f"[FATAL] make_final_video.py (thumb) failed (returncode = {e.returncode})")
+            sys.exit(e.returncode)
 
         print(f"[INFO] --image-only 処理が完了しました（サムネ PNG のみ生成）: {final_thumb_path}")
+        print_stage_stats(time.perf_counter_ns() - started_ns)
         return
 
     # ===== ここからは通常モードのみ =====
 
-    # 2) transcribe.js で文字起こし
-    transcribe_js_path = base_dir / "transcribe.js"
+    # 通常モード: 動画と「音声 + サムネ」を別々の dl_youtube.py で並列に取得する
+    # 動画は最終レンダリングまで使わないので裏で落とし続け、
+    # 先に揃う音声で文字起こし〜TTS を始める
+    cmd_dl_video = [
+        sys.executable,
+        str(DL_SCRIPT_PATH),
+        "--video-id", args.youtube_id,
+        "--output-video", str(video_path),
+    ]
+    cmd_dl_audio = [
+        sys.executable,
+        str(DL_SCRIPT_PATH),
+        "--video-id", args.youtube_id,
+        "--output-audio", str(audio_path),
+        "--output-thumb", str(thumb_path),
+    ]
+
+    # 最終動画の映像（背景 + 埋め込み動画 1 周分）は日本語音声に依存しないので、
+    # 動画のダウンロードとサムネ PNG が揃い次第、文字起こし〜TTS と並行してエンコードしておく。
+    # 最終動画の作成時は、このクリップを -c:v copy でループさせて音声と合わせるだけになる
+    cmd_make_clip = [
+        sys.executable,
+        str(MAKE_FINAL_VIDEO_PATH),
+        str(BACKGROUND_IMAGE_PATH),
+        str(video_path),          # --image-only なのでチェックされない
+        "--header", args.header,
+        "--title", args.title,
+        "--url", youtube_short_url,
+        "--embed-thumb", str(thumb_path),
+        "--embed-video", str(video_path),
+        "--output-thumb", str(final_thumb_path),
+        "--embed-clip", str(embed_clip_path),
+        "--reuse-thumb",
+        "--image-only",
+    ]
+
+    # 2) transcribe.js で文字起こし（音声のみのダウンロードを入力にする）
     cmd_transcribe = [
-        "node",
-        str(transcribe_js_path),
+        NODE_BIN,
+        str(TRANSCRIBE_JS_PATH),
         str(audio_path),
         str(transcribe_path),
         str(transcribe_workdir),
     ]
 
-    print_command("transcribe (transcribe.js)", cmd_transcribe)
-    subprocess.run(cmd_transcribe, check=True)
-
     # 3) translate_to_ja.js で日本語翻訳
-    translate_js_path = base_dir / "translate_to_ja.js"
     cmd_translate = [
-        "node",
-        str(translate_js_path),
+        NODE_BIN,
+        str(TRANSLATE_JS_PATH),
         str(transcribe_path),        # 入力: 英語テキスト
         str(translated_ja_path),     # 出力: 日本語テキスト (translated_ja.txt)
         str(translate_workdir),      # 作業・デバッグ用ディレクトリ
     ]
 
-    print_command("translate_to_ja (translate_to_ja.js)", cmd_translate)
-    subprocess.run(cmd_translate, check=True)
-
-    # 4) text_to_speech.js で日本語テキスト → 日本語音声 (audio_ja.mp3)
-    tts_js_path = base_dir / "text_to_speech.js"
+    # 4) text_to_speech.js で日本語テキスト → 日本語音声 (audio_ja.m4a)
     cmd_tts = [
-        "node",
-        str(tts_js_path),
+        NODE_BIN,
+        str(TTS_JS_PATH),
         str(translated_ja_path),   # 入力: translated_ja.txt
         "--output",
-        str(audio_ja_path),        # 出力: audio_ja.mp3
+        str(audio_ja_path),        # 出力: audio_ja.m4a
     ]
 
-    print_command("text_to_speech (text_to_speech.js)", cmd_tts)
-    subprocess.run(cmd_tts, check=True)
-
     # 5) make_final_video.py で最終動画生成（オリジナル動画を埋め込み）
+    #    サムネ PNG と埋め込みクリップは事前に生成しておくので、映像は作り直さずに使う
     cmd_make_video = [
         sys.executable,
-        str(make_final_video_path),
+        str(MAKE_FINAL_VIDEO_PATH),
         str(BACKGROUND_IMAGE_PATH),
         str(audio_ja_path),
         "--header", args.header,
@@ -280,14 +722,136 @@ def main() -> None:
         "--embed-video", str(video_path),
         "--output-thumb", str(final_thumb_path),
         "--output-video", str(final_video_path),
+        "--embed-clip", str(embed_clip_path),
+        "--reuse-thumb",
     ]
 
-    print_command("make_final_video (make_final_video.py)", cmd_make_video)
-    subprocess.run(cmd_make_video, check=True)
+    # 文字起こし・翻訳・TTS は 1 つの常駐 Node ワーカーで続けて実行する
+    # （表示・キャッシュキー用のコマンドは単体実行と同じ形のまま。ワーカー自身もキャッシュキーの入力に含める）
+    # node の起動と openai / langchain の読み込みがダウンロード待ちの間に済むよう、ここで先に起動しておく
+    node_worker = NodeWorker(PIPELINE_WORKER_JS_PATH)
+
+    # スレッドは submit 時に必要な分だけ起動される
+    background_pool = ThreadPoolExecutor(max_workers=BACKGROUND_WORKERS)
+
+    # どこかのステージが失敗・中断したら、裏のダウンロードやエンコードを待たずに止めてから終了する
+    try:
+        video_future = background_pool.submit(
+            run_cached,
+            "download video (dl_youtube.py)", cmd_dl_video, cache_root,
+            stage="download_video",
+            inputs=[DL_SCRIPT_PATH],
+            outputs=[video_path],
+            params=(args.youtube_id,),
+        )
+
+        try:
+            run_cached(
+                "download audio + thumb (dl_youtube.py)", cmd_dl_audio, cache_root,
+                stage="download_audio",
+                inputs=[DL_SCRIPT_PATH],
+                outputs=[audio_path, thumb_path],
+                params=(args.youtube_id,),
+            )
+        except subprocess.CalledProcessError as e:
+            print(f"[FATAL] dl_youtube.py (audio) failed (returncode = {e.returncode})")
+            sys.exit(e.returncode)
+
+        # サムネ PNG は元サムネさえあれば作れるので、文字起こし〜TTS と並行してバックグラウンドで作っておく
+        print_command("make_final_video (thumb, background)", cmd_make_thumb)
+        def make_thumb() -> None:
+            with stage_timer("make_final_video (thumb, background)", "thumb"):
+                run_make_final_video(cmd_make_thumb)
+
+        thumb_future = background_pool.submit(make_thumb)
+
+        def make_embed_clip() -> None:
+            thumb_future.result()
+            video_future.result()
+            run_cached(
+                "make_final_video (embed clip, background)", cmd_make_clip, cache_root,
+                stage="embed_clip",
+                inputs=[MAKE_FINAL_VIDEO_PATH, BACKGROUND_IMAGE_PATH, thumb_path, video_path],
+                outputs=[embed_clip_path],
+                params=(args.header, args.title, youtube_short_url),
+                runner=run_make_final_video,
+            )
+
+        clip_future = background_pool.submit(make_embed_clip)
+        background_pool.shutdown(wait=False)
+
+        run_cached(
+            "transcribe (transcribe.js)", cmd_transcribe, cache_root,
+            stage="transcribe",
+            inputs=[PIPELINE_WORKER_JS_PATH, TRANSCRIBE_JS_PATH, audio_path],
+            outputs=[transcribe_path],
+            runner=node_worker.run,
+        )
+
+        run_cached(
+            "translate_to_ja (translate_to_ja.js)", cmd_translate, cache_root,
+            stage="translate",
+            inputs=[PIPELINE_WORKER_JS_PATH, TRANSLATE_JS_PATH, transcribe_path],
+            outputs=[translated_ja_path],
+            runner=node_worker.run,
+        )
+
+        run_cached(
+            "text_to_speech (text_to_speech.js)", cmd_tts, cache_root,
+            stage="tts",
+            inputs=[PIPELINE_WORKER_JS_PATH, TTS_JS_PATH, translated_ja_path],
+            outputs=[audio_ja_path],
+            runner=node_worker.run,
+        )
+        node_worker.close()
+
+        # バックグラウンドのサムネ生成を待つ
+        try:
+            thumb_future.result()
+        except subprocess.CalledProcessError as e:
+            print(f"[FATAL] make_final_video.py (thumb) failed (returncode = {e.returncode})")
+            sys.exit(e.returncode)
+
+        # 裏で取得していた動画のダウンロードを待つ
+        try:
+            video_future.result()
+        except subprocess.CalledProcessError as e:
+            print(f"[FATAL] dl_youtube.py (video) failed (returncode = {e.returncode})")
+            sys.exit(e.returncode)
+
+        # 埋め込みクリップは無くても最終動画の作成時にエンコードし直せるので、失敗しても続行する
+        try:
+            clip_future.result()
+        except subprocess.CalledProcessError as e:
+            print(f"[WARN] 埋め込みクリップを作成できませんでした (returncode = {e.returncode})。最終動画の作成時にエンコードします")
+            # 最終動画の作成時に使われないよう、残っていれば消しておく
+            embed_clip_path.unlink(missing_ok=True)
+
+        try:
+            run_cached(
+                "make_final_video (make_final_video.py)", cmd_make_video, cache_root,
+                stage="final_video",
+                inputs=[MAKE_FINAL_VIDEO_PATH, BACKGROUND_IMAGE_PATH, audio_ja_path, thumb_path, video_path],
+                outputs=[final_video_path],
+                params=(args.header, args.title, youtube_short_url),
+                runner=run_make_final_video,
+                link_outputs=False,
+            )
+        except subprocess.CalledProcessError as e:
+            print(f"[FATAL] make_final_video.py failed (returncode = {e.returncode})")
+            sys.exit(e.returncode)
+    except BaseException:
+        _abort_background(background_pool, node_worker)
+        raise
+
+    # キャッシュの上限チェックはステージごとではなく、全ステージの保存が済んだここで 1 回だけ行う
+    if cache_root is not None:
+        _evict_cache(cache_root)
 
     print(f"[INFO] 完了: 動画 = {final_video_path}")
     print(f"[INFO] 完了: サムネ = {final_thumb_path}")
+    print_stage_stats(time.perf_counter_ns() - started_ns)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()